@@ -0,0 +1,226 @@
+"""
+Runs mplapp Windows on an asyncio event loop.
+
+plt.show() blocks, instead the AsyncRunner pumps the GUI events of the
+Windows' canvases from loop callbacks, so coroutines and the GUI share one
+thread.  The pump backs off while the GUI is idle, it sleeps in the asyncio
+loop between pumps rather than spinning.
+
+Widget callbacks may be coroutine functions, the coroutines they return are
+scheduled as tasks on the running loop.
+
+    async def main():
+        window = Window(box)
+        await aio.run(window)
+"""
+
+import asyncio
+
+import matplotlib.pyplot as plt
+
+
+ACTIVITY_EVENTS = [
+    'button_press_event',
+    'button_release_event',
+    'motion_notify_event',
+    'scroll_event',
+    'key_press_event',
+    'key_release_event',
+    'resize_event',
+]
+
+
+class AsyncRunner(object):
+    """
+    Pumps the GUI events of the Windows from an asyncio loop until all of
+    them are closed.
+
+    The pump interval starts at min_interval, doubles while nothing happens
+    up to max_interval, and drops back to min_interval on any canvas event,
+    redraw request or call_soon() call.
+    """
+
+    MIN_INTERVAL = 0.005 # seconds
+    MAX_INTERVAL = 0.050 # seconds
+
+
+    def __init__(
+            self,
+            windows,
+            min_interval = MIN_INTERVAL,
+            max_interval = MAX_INTERVAL,
+            loop = None,
+        ):
+
+        self._windows = list(windows)
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._loop = loop
+
+        self._interval = min_interval
+        self._handle = None
+        self._closed = None
+        self._open = set()
+        self._activity = False
+        self._counts = None
+
+        # statistics
+
+        self._n_pumps = 0
+        self._pump_time = 0.0
+
+
+    def start(self):
+        """
+        Shows the Windows and starts pumping, a loop must be running or be
+        given.
+        """
+
+        if self._loop is None:
+
+            # raises RuntimeError if no loop is running
+
+            self._loop = asyncio.get_running_loop()
+
+        self._closed = self._loop.create_future()
+
+        for window in self._windows:
+
+            canvas = window.canvas()
+
+            self._open.add(window)
+
+            canvas.mpl_connect(
+                'close_event', lambda event, w = window: self._on_close(w))
+
+            for name in ACTIVITY_EVENTS:
+                canvas.mpl_connect(name, self._on_activity)
+
+        plt.show(block = False)
+
+        self._counts = self._activity_counts()
+
+        self._handle = self._loop.call_soon(self._pump)
+
+
+    def stop(self):
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if self._closed is not None and not self._closed.done():
+            self._closed.set_result(None)
+
+
+    async def wait_closed(self):
+        """
+        Waits until all the Windows are closed, or stop() is called.
+        """
+        await self._closed
+
+
+    def stats(self):
+        """
+        Returns a dict with the number of pumps, the mean time spent in a
+        pump in seconds and the current pump interval in seconds.
+        """
+
+        return dict(
+            pumps = self._n_pumps,
+            mean_pump = self._pump_time / max(self._n_pumps, 1),
+            interval = self._interval,
+        )
+
+
+    def _pump(self):
+
+        t0 = self._loop.time()
+
+        for window in list(self._open):
+
+            # closed by plt.close(), which may not emit a close_event
+
+            if not plt.fignum_exists(window.figure().number):
+                self._open.discard(window)
+                continue
+
+            window.canvas().flush_events()
+
+        self._pump_time += self._loop.time() - t0
+        self._n_pumps += 1
+
+        if not self._open:
+            self.stop()
+            return
+
+        counts = self._activity_counts()
+
+        if self._activity or counts != self._counts:
+            self._interval = self._min_interval
+
+        else:
+            self._interval = min(2.0 * self._interval, self._max_interval)
+
+        self._activity = False
+        self._counts = counts
+
+        self._handle = self._loop.call_later(self._interval, self._pump)
+
+
+    def _activity_counts(self):
+
+        return [
+            (
+                window.redraw_stats()['requests'],
+                window.call_soon_stats()['queued'],
+            )
+            for window in self._windows
+        ]
+
+
+    def _on_activity(self, event):
+        self._activity = True
+
+
+    def _on_close(self, window):
+
+        self._open.discard(window)
+
+        if not self._open:
+            self.stop()
+
+
+async def run(*windows, **kwargs):
+    """
+    Shows the Windows and pumps their events until they are all closed, the
+    asyncio counterpart of plt.show().
+    """
+
+    runner = AsyncRunner(
+        windows, loop = asyncio.get_running_loop(), **kwargs)
+
+    runner.start()
+
+    await runner.wait_closed()
+
+
+def schedule(coro):
+    """
+    Schedules the coroutine returned by a widget callback as a task on the
+    running loop.  Without one, e.g. under plt.show(), the coroutine would
+    never run, it is closed and RuntimeError is raised.
+    """
+
+    try:
+        loop = asyncio.get_running_loop()
+
+    except RuntimeError:
+
+        if hasattr(coro, 'close'):
+            coro.close()
+
+        raise RuntimeError(
+            'coroutine callbacks need the Window to run with mplapp.aio')
+
+    return asyncio.ensure_future(coro, loop = loop)
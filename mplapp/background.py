@@ -0,0 +1,192 @@
+import functools
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundTask(object):
+    """
+    A widget callback that runs compute(*args) on an executor and calls
+    done(result) back on the GUI thread, latest wins.
+
+    Use it where a widget expects a callback, e.g.
+
+        Slider(..., notify = BackgroundTask(compute, done, plot))
+
+    Only one job per task runs at a time.  Inputs that arrive while it runs
+    replace each other, so only the latest one runs next and stale inputs
+    are dropped instead of building a backlog.  The result of a job is
+    dropped too when a newer input arrived while it ran, so done() only
+    sees results of the latest input.  An exception raised by compute is
+    raised again on the GUI thread.
+
+    The executor defaults to a shared thread pool, use process_pool() for
+    compute bound work that holds the GIL, compute and its arguments must
+    then be picklable.  Results are handed back to the GUI thread through
+    the call_soon() queue of the widget's Window.
+    """
+
+    def __init__(self, compute, done, widget, executor = None):
+
+        if not callable(compute):
+            raise ValueError("compute isn't callable!")
+
+        if not callable(done):
+            raise ValueError("done isn't callable!")
+
+        self._compute = compute
+        self._done = done
+        self._widget = widget
+        self._executor = executor
+
+        self._running = None  # future of the job in flight
+        self._pending = None  # (args, kwargs) of the latest input
+
+        self._superseded = False  # drop the result of the job in flight
+
+        # statistics
+
+        self._n_submitted = 0
+        self._n_dropped = 0
+        self._n_delivered = 0
+
+
+    def __call__(self, *args, **kwargs):
+
+        if self._pending is not None:
+            self._n_dropped += 1
+
+        self._pending = (args, kwargs)
+
+        if self._running is None:
+            self._submit()
+
+
+    def busy(self):
+        return self._running is not None or self._pending is not None
+
+
+    def cancel(self):
+        """
+        Drops the pending input and the result of the job in flight.  A job
+        already running can't be stopped, the next input waits for it.
+        """
+
+        if self._pending is not None:
+            self._n_dropped += 1
+            self._pending = None
+
+        if self._running is not None and not self._superseded:
+
+            self._n_dropped += 1
+
+            if self._running.cancel():
+                self._running = None
+
+            else:
+                self._superseded = True
+
+
+    def stats(self):
+        """
+        Returns a dict with the number of jobs submitted, inputs and results
+        dropped and results delivered.
+        """
+
+        return dict(
+            submitted = self._n_submitted,
+            dropped = self._n_dropped,
+            delivered = self._n_delivered,
+        )
+
+
+    def _submit(self):
+
+        window = self._widget._window()
+
+        if window is None:
+            raise RuntimeError('the widget must be rendered in a Window')
+
+        args, kwargs = self._pending
+
+        self._pending = None
+
+        executor = self._executor or thread_pool()
+
+        future = executor.submit(self._compute, *args, **kwargs)
+
+        self._running = future
+        self._superseded = False
+        self._n_submitted += 1
+
+        # called on the worker thread, hand the future to the GUI thread,
+        # wrapped so deliveries of different futures never collapse
+
+        future.add_done_callback(
+            lambda f: window.call_soon(functools.partial(self._deliver, f)))
+
+
+    def _deliver(self, future):
+        """
+        Called on the GUI thread with a finished future.
+        """
+
+        # cancelled before it ran
+
+        if future is not self._running:
+            return
+
+        self._running = None
+
+        # cancelled while it ran, its drop was counted then
+
+        if self._superseded:
+
+            if self._pending is not None:
+                self._submit()
+
+            return
+
+        # stale, a newer input arrived while it ran
+
+        if self._pending is not None:
+            self._n_dropped += 1
+            self._submit()
+            return
+
+        self._n_delivered += 1
+
+        self._done(future.result())
+
+
+#------------------------------------------------------------------------------
+# Shared executors
+
+_thread_pool = None
+_process_pool = None
+
+
+def thread_pool():
+    """
+    Returns the thread pool shared by the BackgroundTasks.
+    """
+
+    global _thread_pool
+
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers = 4)
+
+    return _thread_pool
+
+
+def process_pool():
+    """
+    Returns a shared process pool for compute bound BackgroundTasks.
+    """
+
+    global _process_pool
+
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor()
+
+    return _process_pool
@@ -1,5 +1,14 @@
 from abc import ABCMeta, abstractmethod
 
+try:
+    from inspect import isawaitable
+except ImportError:
+    def isawaitable(obj):
+        return False
+
+
+from mplapp.window import Window
+
 
 class Base(object):
 
@@ -7,6 +16,16 @@ class Base(object):
     __metaclass__ = ABCMeta
 
 
+    # widgets that accept keyboard focus set this to True
+
+    _focusable = False
+
+
+    # setter methods whose Window.call_soon() calls collapse to the last one
+
+    _setters = ()
+
+
     @abstractmethod
     def _render(self, fig, x, y):
         pass
@@ -26,3 +45,156 @@ class Base(object):
     def size(self):
         pass
 
+
+    def _window(self):
+        """
+        Returns the Window this widget was rendered into, or None.
+        """
+        return Window.find(self.axes().figure)
+
+
+    def _animate(self, *artists):
+        """
+        Marks artists as dynamic, they are repainted by blitting this widget's
+        axes rather than by redrawing the whole figure.
+        """
+
+        window = self._window()
+
+        if window:
+            window.add_animated(self, *artists)
+
+
+    def _redraw(self, full = False, ax = None):
+        """
+        Requests a repaint of this widget, or only its axes ax, or of the
+        whole figure if full is True.  Requests are coalesced by the Window's
+        redraw scheduler.
+        """
+
+        window = self._window()
+
+        if window:
+            window.request_redraw(None if full else self, ax)
+
+        else:
+            self.canvas().draw_idle()
+
+
+    def _invoke(self, callback, *args):
+        """
+        Calls a user callback.  If it's a coroutine function, the coroutine
+        is scheduled as a task on the asyncio loop running the Window.
+        """
+
+        result = callback(*args)
+
+        if isawaitable(result):
+
+            # asyncio is only imported by apps that use it
+
+            from mplapp.aio import schedule
+
+            return schedule(result)
+
+        return result
+
+
+    def _prepare_draw(self):
+        """
+        Called by the redraw scheduler before repainting this widget, returns
+        True if a full draw is needed.
+        """
+        return False
+
+
+    def _children(self):
+        """
+        Returns the widgets contained in this one, in layout order.
+        """
+        return []
+
+
+    def _focus_in(self, reason):
+        """
+        Called when this widget gains keyboard focus, reason is 'mouse',
+        'tab' or 'other'.
+        """
+        pass
+
+
+    def _focus_out(self):
+        """
+        Called when this widget loses keyboard focus.
+        """
+        pass
+
+
+    def _hit_axes(self):
+        """
+        Returns the axes that receive mouse events for this widget.
+        """
+        return [self.axes()]
+
+
+    def _connect(self, name, handler):
+        """
+        Connects an event handler, returns the connection id.
+        """
+
+        window = self._window()
+
+        if window:
+            return window.connect(self, name, handler)
+
+        return self.canvas().mpl_connect(name, handler)
+
+
+    def _disconnect(self, cid):
+
+        window = self._window()
+
+        if window:
+            window.disconnect(cid)
+
+        else:
+            self.canvas().mpl_disconnect(cid)
+
+
+    def _capture(self):
+        """
+        Routes all mouse events to this widget until _release() is called.
+        """
+
+        window = self._window()
+
+        if window:
+            window.capture(self)
+
+
+    def _release(self):
+
+        window = self._window()
+
+        if window:
+            window.release(self)
+
+
+    def _begin_interaction(self):
+        """
+        Marks this widget as being dragged until _end_interaction() is
+        called, Progressive callbacks render coarse meanwhile.
+        """
+
+        window = self._window()
+
+        if window:
+            window.begin_interaction(self)
+
+
+    def _end_interaction(self):
+
+        window = self._window()
+
+        if window:
+            window.end_interaction(self)
@@ -0,0 +1,347 @@
+"""
+Reactive bindings between widgets.
+
+Values are observables, e.g. set by a Slider, Computed values are declared
+as functions of other observables, and Effects push observables into
+widgets.  Setting Values marks them changed, the nodes downstream are then
+updated in topological order, each at most once per batch however many
+paths lead to it, and only when one of its inputs actually changed.  The
+widgets touched are repainted in one pass at the end of the batch.
+
+    mu = Value(0.0)
+    sigma = Value(1.0)
+
+    Slider(..., notify = mu)
+    Slider(..., notify = sigma)
+
+    def gaussian(m, s):
+        return np.exp(-(t - m) ** 2 / (2 * s ** 2))
+
+    curve = Computed(gaussian, mu, sigma)
+
+    bind_text(mu_label, mu, ' %.2f')
+    bind_line(plot, line, curve)
+
+    with batch():
+        mu.set(1.0)
+        sigma.set(2.0)
+"""
+
+import contextlib
+import heapq
+import itertools
+
+
+import numpy as np
+
+
+class Observable(object):
+    """
+    A node of the binding graph, its rank is one more than the highest rank
+    of its inputs, so sorting by rank is a topological order.
+    """
+
+    def __init__(self, inputs = ()):
+
+        self._inputs = list(inputs)
+        self._outputs = []
+        self._rank = 1 + max([i._rank for i in self._inputs] or [-1])
+
+        for i in self._inputs:
+            i._outputs.append(self)
+
+        self._value = None
+
+
+    def get(self):
+        return self._value
+
+
+    def _update(self):
+        """
+        Recomputes the node from its inputs, returns True if its value
+        changed.
+        """
+        return False
+
+
+class Value(Observable):
+    """
+    A source value.  Calling it sets it, so it may be used as a widget
+    callback, e.g. Slider(..., notify = value).
+    """
+
+    def __init__(self, value = None):
+        super(Value, self).__init__()
+        self._value = value
+
+
+    def __call__(self, value):
+        self.set(value)
+
+
+    def set(self, value):
+
+        if _equal(value, self._value):
+            return
+
+        self._value = value
+
+        _graph.changed(self)
+
+
+class Computed(Observable):
+    """
+    func(*inputs values), recomputed when an input changes.
+    """
+
+    def __init__(self, func, *inputs):
+
+        if not callable(func):
+            raise ValueError("func isn't callable!")
+
+        super(Computed, self).__init__(inputs)
+
+        self._func = func
+
+        self._value = func(*[i.get() for i in inputs])
+
+
+    def _update(self):
+
+        value = self._func(*[i.get() for i in self._inputs])
+
+        _graph.stats['computed'] += 1
+
+        if _equal(value, self._value):
+            return False
+
+        self._value = value
+
+        return True
+
+
+class Effect(Observable):
+    """
+    Calls func(*inputs values) when an input changes, and once now.  The
+    widgets it updates are repainted at the end of the batch.
+    """
+
+    def __init__(self, func, *inputs, **kwargs):
+
+        if not callable(func):
+            raise ValueError("func isn't callable!")
+
+        super(Effect, self).__init__(inputs)
+
+        self._func = func
+        self._widgets = kwargs.get('widgets', [])
+
+        self._run()
+
+
+    def _update(self):
+
+        self._run()
+
+        _graph.stats['effects'] += 1
+
+        return False
+
+
+    def _run(self):
+
+        self._func(*[i.get() for i in self._inputs])
+
+        for widget in self._widgets:
+            _graph.touched(widget)
+
+
+@contextlib.contextmanager
+def batch():
+    """
+    Propagates the changes of the Values set in the block once, at its end.
+    """
+
+    _graph.depth += 1
+
+    try:
+        yield
+
+    finally:
+
+        _graph.depth -= 1
+
+        if _graph.depth == 0:
+            _graph.propagate()
+
+
+def bind_text(label, source, fmt = '%s'):
+    """
+    Keeps the label's text at fmt % source, returns the Effect.
+    """
+
+    return Effect(
+        lambda v: label.text(fmt % v),
+        source,
+        widgets = [label],
+    )
+
+
+def bind_line(plot, line, y, x = None):
+    """
+    Keeps the data of the plot's Line2D at x, y, observables or, for x,
+    None to keep its x data or a constant array.  Returns the Effect.
+    """
+
+    def update(y, x = None):
+
+        if x is None:
+            line.set_ydata(y)
+
+        else:
+            line.set_data(x, y)
+
+        plot._redraw(full = True)
+
+    inputs = [y]
+
+    if isinstance(x, Observable):
+        inputs.append(x)
+
+    elif x is not None:
+        line.set_xdata(x)
+
+    return Effect(update, *inputs, widgets = [plot])
+
+
+def stats():
+    """
+    Returns a dict with the number of batches propagated, of Computed values
+    recomputed and Effects run, and of nodes skipped because none of their
+    inputs changed.
+    """
+    return dict(_graph.stats)
+
+
+#------------------------------------------------------------------------------
+# Support classes
+
+class _Graph(object):
+    """
+    The propagation state, shared by all the nodes of the GUI thread.
+    """
+
+    def __init__(self):
+
+        self.depth = 0           # nested batch() blocks
+        self.propagating = False
+
+        self._changed = []       # Values set since the last propagation
+        self._windows = []       # Windows with widgets to repaint
+
+        self.stats = dict(batches = 0, computed = 0, effects = 0, skipped = 0)
+
+
+    def changed(self, value):
+
+        self._changed.append(value)
+
+        if self.depth == 0 and not self.propagating:
+            self.propagate()
+
+
+    def touched(self, widget):
+        """
+        Marks the widget's Window to be repainted at the end of the batch.
+        """
+
+        window = widget._window()
+
+        if window is not None and window not in self._windows:
+            self._windows.append(window)
+
+
+    def propagate(self):
+
+        self.propagating = True
+
+        try:
+
+            # Values set by Effects are propagated in a new pass
+
+            while self._changed:
+
+                changed = set(self._changed)
+                self._changed = []
+
+                self._propagate(changed)
+
+                self.stats['batches'] += 1
+
+        finally:
+            self.propagating = False
+
+        windows = self._windows
+        self._windows = []
+
+        for window in windows:
+            window.flush_redraws()
+
+
+    def _propagate(self, changed):
+        """
+        Updates the nodes downstream of the changed ones in rank order, each
+        once, only if one of its inputs changed.
+        """
+
+        order = itertools.count()
+
+        heap = []
+        queued = set()
+
+        def push(node):
+            for out in node._outputs:
+                if out not in queued:
+                    queued.add(out)
+                    heapq.heappush(heap, (out._rank, next(order), out))
+
+        for node in changed:
+            push(node)
+
+        while heap:
+
+            _, _, node = heapq.heappop(heap)
+
+            if not any(i in changed for i in node._inputs):
+                self.stats['skipped'] += 1
+                continue
+
+            if node._update():
+                changed.add(node)
+                push(node)
+
+
+_graph = _Graph()
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _equal(a, b):
+
+    if a is b:
+        return True
+
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (
+            isinstance(a, np.ndarray) and
+            isinstance(b, np.ndarray) and
+            np.array_equal(a, b)
+        )
+
+    try:
+        return bool(a == b)
+
+    except (TypeError, ValueError):
+        return False
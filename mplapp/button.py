@@ -1,6 +1,5 @@
 # Python
 import colorsys
-import time
 
 from matplotlib.colors import ColorConverter
 
@@ -28,6 +27,10 @@ class Button(Label):
 
         self._cid = None
 
+        self._normal_color = None
+        self._pressed_color = None
+        self._blink_timer = None
+
 
     def is_enabled(self):
         return self._cid is not None
@@ -51,10 +54,9 @@ class Button(Label):
 
         self._text.set_color(text_color)
 
-        self._axes.figure.canvas.draw()
+        self._redraw()
 
-        self._cid = self._axes.figure.canvas.mpl_connect(
-            'button_press_event', self._blink_on_click)
+        self._cid = self._connect('button_press_event', self._blink_on_click)
 
 
     def disable(self):
@@ -62,7 +64,7 @@ class Button(Label):
         if self._cid is None: # already disabled?
             return
 
-        self._axes.figure.canvas.mpl_disconnect(self._cid)
+        self._disconnect(self._cid)
         self._cid = None
 
         # set disabled colors
@@ -80,16 +82,23 @@ class Button(Label):
 
         self._text.set_color(grey65)
 
-        self._axes.figure.canvas.draw()
+        self._redraw()
 
 
     def _render(self, fig, x, y):
         super(Button, self)._render(fig, x, y)
 
-        self._cid = self._axes.figure.canvas.mpl_connect(
-            'button_press_event',
-            self._blink_on_click
-        )
+        ax = self._axes
+
+        self._normal_color = ax.get_axis_bgcolor()
+        self._pressed_color = _pressed_color(self._normal_color)
+
+        # the whole button changes color on click, so the face and frame are
+        # repainted with the text
+
+        self._animate(ax.patch, *ax.spines.values())
+
+        self._cid = self._connect('button_press_event', self._blink_on_click)
 
 
     def _blink_on_click(self, event):
@@ -97,42 +106,75 @@ class Button(Label):
         'blink' the axis color to give visual feedback the button has been
         pressed.
 
-        Reference: http://stackoverflow.com/a/1165145/562106
-
+        The pressed color is painted before the callback runs, and a timer
+        started after it restores the normal color, so the GUI thread never
+        sleeps and a slow callback still shows the pressed button.
         """
 
         if event.inaxes != self._axes:
             return
 
-        orig_color = self._axes.get_axis_bgcolor()
+        self._axes.set_axis_bgcolor(self._pressed_color)
+        self._redraw()
+
+        # paint it now, not on the scheduler's next tick
+
+        window = self._window()
+
+        if window:
+            window.flush_redraws()
+
+        try:
+            if self._callback:
+                self._invoke(self._callback, event)
 
-        r,g,b = ColorConverter().to_rgb(orig_color)
+        finally:
 
-        cmax = max([r,g,b])
-        cmin = min([r,g,b])
+            if self._blink_timer is None:
+                self._blink_timer = self.canvas().new_timer(interval = 50)
+                self._blink_timer.single_shot = True
+                self._blink_timer.add_callback(self._end_blink)
 
-        # gray?
-        if abs(cmax - cmin) < 5:
+            # restart, rapid clicks extend the blink
 
-            if cmax > 0.5:
-                r,g,b = 0.10,0.10,0.10
-            else:
-                r,g,b = 0.90,0.90,0.90
+            self._blink_timer.stop()
+            self._blink_timer.start()
+
+
+    def _end_blink(self):
+
+        # the callback may have disabled the button, which sets its own colors
+
+        if not self.is_enabled():
+            return
+
+        self._axes.set_axis_bgcolor(self._normal_color)
+        self._redraw()
+
+
+def _pressed_color(color):
+    """
+    Returns the color used to 'blink' a button with the given face color.
+
+    Reference: http://stackoverflow.com/a/1165145/562106
+    """
 
-        h,l,s = colorsys.rgb_to_hls(r,g,b)
+    r,g,b = ColorConverter().to_rgb(color)
 
-        # invert hue
-        h = 360.0 - h
+    cmax = max([r,g,b])
+    cmin = min([r,g,b])
 
-        new_color = colorsys.hls_to_rgb(h,l,s)
+    # gray?
+    if abs(cmax - cmin) < 5:
 
-        self._axes.set_axis_bgcolor(new_color)
-        self._axes.figure.canvas.draw()
+        if cmax > 0.5:
+            r,g,b = 0.10,0.10,0.10
+        else:
+            r,g,b = 0.90,0.90,0.90
 
-        time.sleep(0.05)
+    h,l,s = colorsys.rgb_to_hls(r,g,b)
 
-        self._axes.set_axis_bgcolor(orig_color)
-        self._axes.figure.canvas.draw()
+    # invert hue
+    h = 360.0 - h
 
-        if self._callback:
-            self._callback(event)
+    return colorsys.hls_to_rgb(h,l,s)
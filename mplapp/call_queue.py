@@ -0,0 +1,254 @@
+from collections import OrderedDict
+import threading
+import time
+import traceback
+
+
+class CallQueue(object):
+    """
+    A thread-safe queue of calls to run on the GUI thread.
+
+    Any thread may put() a call, a repeating canvas timer drains the queue in
+    batches on the GUI thread.  The timer only runs while calls are queued,
+    the first put() starts it, directly on the GUI thread, or from other
+    threads through the backend's thread-safe way of posting a call to its
+    event loop (Tk, Qt, GTK and wx).  Other backends fall back to polling
+    the queue every IDLE_INTERVAL.
+
+    Calls with the same key, queued within one tick, collapse, only the
+    last arguments are applied and the call keeps its place in the queue.
+    Bound widget setters listed in the widget's _setters, e.g. label.text,
+    are keyed by (widget, method), other callables only collapse if a key
+    is given.
+    """
+
+    INTERVAL = 15 # milliseconds
+    IDLE_INTERVAL = 250 # milliseconds, polling without a thread-safe wakeup
+
+
+    def __init__(self, canvas, interval = INTERVAL):
+
+        self._lock = threading.Lock()
+        self._thread = threading.current_thread() # the GUI thread
+        self._armed = False                       # the timer is running
+
+        self._calls = OrderedDict() # key -> (func, args, enqueue time)
+
+        # statistics
+
+        self._n_queued = 0
+        self._n_collapsed = 0
+        self._n_applied = 0
+        self._n_batches = 0
+        self._max_depth = 0
+        self._latency_sum = 0.0
+        self._max_latency = 0.0
+
+        # the timers are created here, on the GUI thread, worker threads
+        # never touch matplotlib
+
+        self._timer = canvas.new_timer(interval = interval)
+        self._timer.add_callback(self.drain)
+
+        self._wakeup = _threadsafe_wakeup(canvas, self._start)
+
+        self._poll = None
+
+        if self._wakeup is None:
+            self._poll = canvas.new_timer(interval = self.IDLE_INTERVAL)
+            self._poll.add_callback(self.drain)
+            self._poll.start()
+
+
+    def put(self, func, args, key = None):
+
+        key = _collapse_key(func, key)
+
+        now = time.time()
+
+        with self._lock:
+
+            self._n_queued += 1
+
+            old = self._calls.get(key, None)
+
+            if old is not None:
+                self._n_collapsed += 1
+                now = old[2]
+
+            # assigning an existing key keeps its place
+
+            self._calls[key] = (func, args, now)
+
+            self._max_depth = max(self._max_depth, len(self._calls))
+
+            wake = not self._armed
+
+            self._armed = True
+
+        if wake:
+
+            if threading.current_thread() is self._thread:
+                self._start()
+
+            elif self._wakeup is not None:
+                self._wakeup()
+
+
+    def drain(self):
+        """
+        Runs the queued calls, called by the timer on the GUI thread.
+        """
+
+        with self._lock:
+
+            calls = self._calls
+            self._calls = OrderedDict()
+
+            # idle, a later put() starts the timer again
+
+            if not calls:
+                self._armed = False
+
+        if not calls:
+            self._timer.stop()
+            return
+
+        self._n_batches += 1
+
+        for func, args, t in calls.values():
+
+            latency = time.time() - t
+
+            self._latency_sum += latency
+            self._max_latency = max(self._max_latency, latency)
+            self._n_applied += 1
+
+            try:
+                func(*args)
+
+            except Exception:
+                traceback.print_exc()
+
+
+    def stop(self):
+
+        self._timer.stop()
+
+        if self._poll is not None:
+            self._poll.stop()
+
+
+    def _start(self):
+        """
+        Starts the timer, on the GUI thread.
+        """
+        self._timer.start()
+
+
+    def stats(self):
+        """
+        Returns a dict with the current and max queue depth, the number of
+        calls queued, collapsed and applied, the number of batches, and the
+        mean and max latency in seconds from queueing to running a call.
+        """
+
+        with self._lock:
+            depth = len(self._calls)
+
+        n = max(self._n_applied, 1)
+
+        return dict(
+            depth = depth,
+            max_depth = self._max_depth,
+            queued = self._n_queued,
+            collapsed = self._n_collapsed,
+            applied = self._n_applied,
+            batches = self._n_batches,
+            mean_latency = self._latency_sum / n,
+            max_latency = self._max_latency,
+        )
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _collapse_key(func, key):
+    """
+    Calls with a key collapse per key, bound widget setters per (widget,
+    method), anything else gets a unique key.
+    """
+
+    if key is not None:
+        return ('key', key)
+
+    obj = getattr(func, '__self__', None)
+
+    if (
+        obj is not None and
+        hasattr(func, '__func__') and
+        func.__name__ in getattr(obj, '_setters', ())
+    ):
+        return (id(obj), func.__func__)
+
+    return object()
+
+
+def _threadsafe_wakeup(canvas, func):
+    """
+    Returns a function, callable from any thread, that makes the canvas'
+    event loop call func on the GUI thread, or None if the backend has no
+    thread-safe way to post a call.
+    """
+
+    module = type(canvas).__module__
+
+    if hasattr(canvas, 'get_tk_widget'):
+
+        # tkinter marshals calls from other threads to the Tcl thread
+
+        widget = canvas.get_tk_widget()
+
+        return lambda: widget.after(0, func)
+
+    if 'backend_qt' in module:
+
+        from matplotlib.backends.qt_compat import QtCore
+
+        class Waker(QtCore.QObject):
+
+            # emitted from any thread, the slot runs on the thread the
+            # Waker lives in, the GUI thread
+
+            wake = QtCore.Signal()
+
+            @QtCore.Slot()
+            def on_wake(self):
+                func()
+
+        waker = Waker()
+        waker.wake.connect(waker.on_wake)
+
+        # keeps the Waker alive with the canvas
+
+        canvas._mplapp_waker = waker
+
+        return waker.wake.emit
+
+    if 'backend_gtk' in module:
+
+        from gi.repository import GLib
+
+        def idle():
+            func()
+            return False
+
+        return lambda: GLib.idle_add(idle)
+
+    if 'backend_wx' in module:
+
+        import wx
+
+        return lambda: wx.CallAfter(func)
+
+    return None
@@ -1,4 +1,5 @@
 import enum
+import math
 
 import numpy as np
 
@@ -9,6 +10,8 @@ from matplotlib.patches import Polygon
 import pyperclip
 
 
+from mplapp.history import History
+from mplapp.item_index import ItemIndex
 from mplapp.line_edit import LineEdit
 
 
@@ -20,6 +23,24 @@ class ComboBox(LineEdit):
     A ComboxBox, upon clicking button, drops down a list of items to choose.
 
     Items can be edited also.
+
+    The dropdown is virtualized, a fixed pool of _n_lines text artists is
+    bound to the visible window of items, so opening and scrolling it doesn't
+    depend on the number of items.  The list scrolls with the mouse wheel and
+    the up, down, pageup, pagedown, home and end keys.
+
+    With filter_mode = 'prefix' or 'substring', the dropdown opens as the user
+    types and only shows the items starting with, or containing, the text,
+    case insensitive.  The items are searched with an ItemIndex, not scanned.
+
+    Committed edits are added to a History of unique items, history_size
+    bounds it by evicting the least recently used items, and with
+    move_to_top = True the most recently used items are listed first.
+
+    text_list is copied into the History, the caller's list isn't updated
+    with the edits, and the idx passed to selection_notify(idx, text) is
+    the position of the item in items(), the current display order, not in
+    text_list.
     """
 
 
@@ -30,6 +51,9 @@ class ComboBox(LineEdit):
             text_list,
             edit_notify = None,
             selection_notify = None,
+            filter_mode = None,
+            history_size = None,
+            move_to_top = False,
             **kwargs
         ):
 
@@ -41,7 +65,11 @@ class ComboBox(LineEdit):
         super(ComboBox,self).__init__(
             width, height, text, self._on_edit_notify, **kwargs)
 
-        self._text_list = text_list
+        self._text_list = History(text_list, history_size, move_to_top)
+
+        # room for the drop down button
+
+        self._pad_right = 0.30 # inches
 
         self._edit_notify = edit_notify
         self._selection_notify = selection_notify
@@ -52,6 +80,23 @@ class ComboBox(LineEdit):
         if selection_notify and not callable(selection_notify):
             raise RuntimeError('selection_notify must be a callable function')
 
+        if filter_mode not in _FILTER_MODES:
+            raise ValueError('unknown filter_mode %s' % repr(filter_mode))
+
+        #---------------------------------------------------------------------
+        # type-ahead filtering
+        #
+        # self._shown holds the items matching the text, or None when the
+        # dropdown shows every item
+
+        self._filter_mode = filter_mode
+        self._index = None
+        self._shown = None
+
+        if filter_mode:
+            self._index = ItemIndex(
+                self._text_list, substring = filter_mode == 'substring')
+
         #---------------------------------------------------------------------
         # additional items
         #
@@ -62,17 +107,25 @@ class ComboBox(LineEdit):
         self._select_axes = None
         self._select_highlight = None # just a rectangle
         self._select_posx = None
-        self._select_entries = []
+        self._select_entries = [] # the pool of text artists, one per row
+        self._select_row = 0      # highlighted row
+        self._scroll = 0          # index of the item in the first row
 
         self._cb_state = ComboState.IDLE
 
         self._n_lines = 5
 
-        self._mouse_motion_cid = None
-
         self._ignore_edit_notify = False
 
 
+    def items(self):
+        """
+        Returns the items in display order, the list selection_notify's idx
+        indexes.
+        """
+        return list(self._text_list)
+
+
     def _render(self, fig, x, y):
 
         super(ComboBox, self)._render(fig, x, y)
@@ -80,6 +133,8 @@ class ComboBox(LineEdit):
         self._render_dropdown_button(fig)
         self._render_dropdown_axis(fig, x, y)
 
+        self._connect('scroll_event', self._on_scroll)
+
 
     def _render_dropdown_axis(self, fig, x, y):
 
@@ -112,6 +167,28 @@ class ComboBox(LineEdit):
 
         self._select_axes = ax
 
+        #----------------------------------------------------------------------
+        # the highlight and the pool of text artists
+
+        self._select_highlight = Rectangle(
+            (0, self._row_y(0) - self._height / 2.0),
+            self._width,
+            self._height,
+            ec = self._hl_color,
+            fc = self._hl_color
+        )
+
+        ax.add_patch(self._select_highlight)
+
+        for i in range(self._n_lines):
+
+            txt = ax.text(
+                self._pad_left, self._row_y(i), '', ha = 'left', va = 'center')
+
+            self._select_entries.append(txt)
+
+        self._animate(self._select_highlight, *self._select_entries)
+
 
     def _render_dropdown_button(self, fig):
 
@@ -147,59 +224,41 @@ class ComboBox(LineEdit):
         self._axes.add_patch(patch)
 
 
-    def _cb_change_state(self, new_state):
-
-        if self._cb_state == new_state:
-            raise RuntimeError("Already in state %s" % new_state)
-
-        if self._cb_state == ComboState.IDLE:
-
-            if new_state == ComboState.DROP_SELECT:
-                self._select_axes.set_visible(True)
+    def _hit_axes(self):
+        return [self._axes, self._select_axes]
 
-                x = self._pad_left
-                y = ((self._n_lines - 1) * self._height)
 
-                #--------------------------------------------------------------
-                # create highlight
+    def _focus_out(self):
 
-                if self._select_highlight is None:
+        # leaving the combo box doesn't commit an edit
 
-                    self._select_highlight = Rectangle(
-                        (0,y - self._height / 2.0),
-                        self._width,
-                        self._height,
-                        ec = self._hl_color,
-                        fc = self._hl_color
-                    )
+        self._ignore_edit_notify = True
 
-                    self._select_axes.add_patch(self._select_highlight)
+        if self._cb_state != ComboState.IDLE:
+            self._cb_change_state(ComboState.IDLE)
 
-                else:
-                    self._select_highlight.set_visible(True)
+        super(ComboBox, self)._focus_out()
 
-                # delete existing text objects
 
-                for t in self._select_entries:
-                    t.remove()
-                    del t
+    def _cb_change_state(self, new_state):
 
-                self._select_entries = []
+        if self._cb_state == new_state:
+            raise RuntimeError("Already in state %s" % new_state)
 
-                for t in self._text_list:
+        if self._cb_state == ComboState.IDLE:
 
-                    txt = self._select_axes.text(
-                        x,y,t, ha = 'left', va = 'center')
+            if new_state == ComboState.DROP_SELECT:
+                self._select_axes.set_visible(True)
 
-                    y -= self._height
+                self._scroll = 0
+                self._bind_entries()
+                self._highlight_row(0)
 
-                    self._select_entries.append(txt)
+                # the dropdown overlaps other widgets, keep the pointer
 
-                self._mouse_motion_cid = self._select_axes.figure.canvas.mpl_connect(
-                    'motion_notify_event', self._on_mouse_motion
-                )
+                self._capture()
 
-                self.canvas().draw()
+                self._redraw(full = True)
 
             else: self._unhandled_state(new_state)
 
@@ -207,7 +266,8 @@ class ComboBox(LineEdit):
 
             if new_state == ComboState.IDLE:
                 self._select_axes.set_visible(False)
-                self.canvas().draw()
+                self._release()
+                self._redraw(full = True)
 
             else: self._unhandled_state(new_state)
 
@@ -243,6 +303,7 @@ class ComboBox(LineEdit):
             d = np.sqrt( (x - cx) ** 2 )
 
             if d <= 0.16:
+                self._shown = None
                 self._cb_change_state(ComboState.DROP_SELECT)
 
             else:
@@ -250,20 +311,7 @@ class ComboBox(LineEdit):
 
         elif self._cb_state == ComboState.DROP_SELECT:
 
-            y = self._select_highlight.get_y()
-
-            idx = self._find_text_entry(y)
-
-            selection = self._text_list[idx]
-
-            self._ignore_edit_notify = True
-
-            self.text(selection)
-
-            if self._selection_notify:
-                self._selection_notify(idx, selection)
-
-            self._cb_change_state(ComboState.IDLE)
+            self._select_item(self._scroll + self._select_row)
 
         elif _DEV:
             print("on_mouse_down(): unhandled %s" % self._cb_state)
@@ -281,40 +329,238 @@ class ComboBox(LineEdit):
 
         if self._cb_state == ComboState.DROP_SELECT:
 
-            idx = self._find_text_entry(y)
+            row = self._find_text_entry(y) - self._scroll
+
+            # only repaint when the hovered row changes
+
+            if row != self._select_row:
+                self._highlight_row(row)
+
 
-            _, y = self._select_entries[idx].get_position()
+    def _on_scroll(self, event):
 
-            self._select_highlight.set_y(y - self._height / 2.0)
+        if self._cb_state != ComboState.DROP_SELECT:
+            return
+
+        if event.inaxes != self._select_axes:
+            return
 
-            self.canvas().draw()
+        self._scroll_list(self._scroll - int(event.step))
 
 
     def _on_key_press(self, event):
 
-        if event.key == 'escape' and self._cb_state == ComboState.DROP_SELECT:
-            self._cb_change_state(ComboState.IDLE)
+        if self._cb_state == ComboState.DROP_SELECT:
+
+            key = event.key
+
+            if key == 'escape':
+                self._cb_change_state(ComboState.IDLE)
+
+            elif key in _NAV_KEYS:
+                self._navigate(key)
+                return
+
+            elif key == 'enter':
+
+                if self._n_items() > 0:
+                    self._select_item(self._scroll + self._select_row)
+                    return
+
+                # nothing matches, the line edit commits the text
+
+                self._cb_change_state(ComboState.IDLE)
 
         self._ignore_edit_notify = False
 
         super(ComboBox, self)._on_key_press(event)
 
 
-    def _find_text_entry(self, y):
+    def _navigate(self, key):
+        """
+        Moves the highlight with the keyboard, scrolling the list to keep it
+        visible.
+        """
+
+        N = self._n_items()
+
+        if N == 0:
+            return
+
+        page = self._n_lines
+
+        idx = self._scroll + self._select_row
 
-         # find nearest text
+        idx += {
+            'up' : -1,
+            'down' : 1,
+            'pageup' : -page,
+            'pagedown' : page,
+            'home' : -N,
+            'end' : N,
+        }[key]
 
-        dist = []
+        idx = min(max(idx, 0), N - 1)
 
-        for txt in self._select_entries:
+        if idx < self._scroll:
+            self._scroll_list(idx)
 
-            _, ydata = txt.get_position()
+        elif idx >= self._scroll + page:
+            self._scroll_list(idx - page + 1)
 
-            d = np.abs(ydata - y)
+        self._highlight_row(idx - self._scroll)
 
-            dist.append(d)
 
-        return np.argmin(dist)
+    def _select_item(self, row):
+
+        if row >= self._n_items():
+            return
+
+        selection = self._item(row)
+
+        idx = self._text_list.index(selection)
+
+        self._ignore_edit_notify = True
+
+        self.text(selection)
+
+        self._text_list.touch(selection)
+
+        if self._selection_notify:
+            self._invoke(self._selection_notify, idx, selection)
+
+        self._cb_change_state(ComboState.IDLE)
+
+
+    def _row_y(self, row):
+        """
+        Returns the y data position of the center of the dropdown row.
+        """
+        return (self._n_lines - 1 - row) * self._height
+
+
+    def _bind_entries(self):
+        """
+        Binds the pool of text artists to the items in the visible window.
+        """
+
+        N = self._n_items()
+
+        for row, txt in enumerate(self._select_entries):
+
+            idx = self._scroll + row
+
+            if idx < N:
+                txt.set_text(self._item(idx))
+                txt.set_visible(True)
+
+            else:
+                txt.set_visible(False)
+
+
+    def _scroll_list(self, first):
+        """
+        Scrolls the dropdown so the item first is in the top row, only the
+        dropdown axes is repainted.
+        """
+
+        first = min(first, self._n_items() - self._n_lines)
+        first = max(first, 0)
+
+        if first == self._scroll:
+            return
+
+        self._scroll = first
+
+        self._bind_entries()
+
+        self._redraw(ax = self._select_axes)
+
+
+    def _n_items(self):
+        """
+        Returns the number of items shown in the dropdown.
+        """
+
+        if self._shown is None:
+            return len(self._text_list)
+
+        return len(self._shown)
+
+
+    def _item(self, i):
+        """
+        Returns the i-th item shown.
+        """
+
+        if self._shown is None:
+            return self._text_list[i]
+
+        return self._shown[i]
+
+
+    def _edit(self, i0, i1, new_text):
+
+        super(ComboBox, self)._edit(i0, i1, new_text)
+
+        if self._index is not None:
+            self._update_filter()
+
+
+    def _update_filter(self):
+        """
+        Shows the items matching the text, opening the dropdown if needed.
+        """
+
+        query = self.text()
+
+        if not query:
+            self._shown = None
+
+        elif self._filter_mode == 'prefix':
+            self._shown = self._items(self._index.prefix(query))
+
+        else:
+            self._shown = self._items(self._index.substring(query))
+            self._shown.sort(key = self._text_list.rank)
+
+        if self._cb_state == ComboState.IDLE:
+            self._cb_change_state(ComboState.DROP_SELECT)
+            return
+
+        self._scroll = 0
+        self._bind_entries()
+        self._highlight_row(0)
+
+
+    def _items(self, ids):
+        item = self._index.item
+        return [item(i) for i in ids]
+
+
+    def _highlight_row(self, row):
+
+        self._select_row = row
+
+        self._select_highlight.set_y(self._row_y(row) - self._height / 2.0)
+
+        self._redraw(ax = self._select_axes)
+
+
+    def _find_text_entry(self, y):
+        """
+        Returns the index of the visible item at the y data position.  Rows
+        are self._height tall and centered on self._row_y(), so the row is
+        computed directly.
+        """
+
+        row = self._n_lines - 1 - int(math.floor(y / self._height + 0.5))
+
+        last = min(self._n_lines, self._n_items() - self._scroll) - 1
+
+        row = max(min(row, last), 0)
+
+        return self._scroll + row
 
 
     def _on_edit_notify(self, text):
@@ -323,13 +569,28 @@ class ComboBox(LineEdit):
             self._ignore_edit_notify = False
             return
 
-        # add to the list
+        # add to the history
+
+        is_new = text not in self._text_list
+
+        evicted = self._text_list.add(text)
+
+        if self._index is not None:
 
-        self._text_list.append(text)
+            if is_new:
+                self._index.add(text)
+
+            for item in evicted:
+                self._index.remove(item)
 
         if self._edit_notify:
-            self._edit_notify(text)
+            self._invoke(self._edit_notify, text)
+
+
+
+_NAV_KEYS = ['up', 'down', 'pageup', 'pagedown', 'home', 'end']
 
+_FILTER_MODES = [None, 'prefix', 'substring']
 
 
 #------------------------------------------------------------------------------
@@ -0,0 +1,356 @@
+"""
+File-backed data sources for Plot.series().
+
+A MemmapSource plots a recording that is memory-mapped rather than loaded.
+Only the samples and pyramid entries the current view needs are read, in
+pages copied into a byte bounded LRUCache, so panning back over a view
+doesn't touch the file again and resident memory stays bounded.
+
+The decimation pyramid is built in one pass over the file.  With persist =
+True it is built once into a directory next to it, <file>.lod, and
+memory-mapped when the file is opened again, so opening a recording only
+reads a few pages.
+
+    source = open_recording(
+        'run42.f32', dtype = np.float32, dx = 1e-3, persist = True)
+    plot.series(source, color = 'b')
+"""
+
+import json
+import os
+
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+
+from mplapp.decimate import FACTOR, MinMaxPyramid, build_levels
+from mplapp.lru import LRUCache
+
+
+class MemmapSource(object):
+    """
+    A series whose y, and optionally x, are memmaps, x sorted ascending.
+    Without x the samples are uniformly spaced, y[i] at x0 + i * dx.
+
+    The pyramid levels from first_level up are kept in memory, or persisted
+    in lod_path, or with persist = True in the memmap's file name + '.lod',
+    and rebuilt there when the data file changes.  If they can't be written
+    there, e.g. in a read-only directory, they are kept in memory and
+    lod_path() returns None.
+    """
+
+    CACHE_BYTES = 64 * 2 ** 20
+    PAGE_SIZE = 1024 # entries
+    FIRST_LEVEL = 3
+
+
+    def __init__(
+            self,
+            y,
+            x = None,
+            x0 = 0.0,
+            dx = 1.0,
+            cache_bytes = CACHE_BYTES,
+            page_size = PAGE_SIZE,
+            first_level = FIRST_LEVEL,
+            lod_path = None,
+            persist = False,
+        ):
+
+        if persist and lod_path is None:
+
+            if not getattr(y, 'filename', None):
+                raise ValueError('persist needs y to be backed by a file')
+
+            lod_path = y.filename + '.lod'
+
+        self._y = y
+        self._x = UniformAxis(x0, dx, len(y)) if x is None else x
+        self._lod_path = lod_path
+        self._first_level = first_level
+
+        self._cache = LRUCache(cache_bytes, sizeof = lambda a: a.nbytes)
+
+        def paged(key, array):
+            return PagedArray(array, self._cache, key, page_size)
+
+        levels = [
+            paged(k, level) for k, level in enumerate(self._open_levels())
+        ]
+
+        if x is not None:
+            self._x = paged('x', x)
+
+        self._pyramid = MinMaxPyramid(
+            self._x,
+            paged('y', y),
+            levels = levels,
+            first_level = first_level,
+        )
+
+
+    def __len__(self):
+        return len(self._y)
+
+
+    def pyramid(self):
+        return self._pyramid
+
+
+    def lod_path(self):
+        return self._lod_path
+
+
+    def cache_stats(self):
+        """
+        Returns the statistics of the page cache, sizes in bytes.
+        """
+        return self._cache.stats()
+
+
+    def _open_levels(self):
+        """
+        Returns the persisted pyramid levels, building them if missing or
+        stale.
+        """
+
+        path = self._lod_path
+
+        if path is None:
+            return build_levels(self._y, FACTOR, self._first_level)
+
+        key = self._key()
+
+        try:
+            with open(os.path.join(path, 'meta.json')) as fd:
+                meta = json.load(fd)
+
+        except (IOError, OSError, ValueError):
+            meta = None
+
+        if meta and meta['key'] == key:
+
+            return [
+                np.load(_level_file(path, k), mmap_mode = 'r')
+                for k in range(meta['levels'])
+            ]
+
+        try:
+            return self._build_levels(path, key)
+
+        except (IOError, OSError):
+
+            # not writable, without the meta file a partial pyramid is
+            # ignored the next time
+
+            self._lod_path = None
+
+            return build_levels(self._y, FACTOR, self._first_level)
+
+
+    def _build_levels(self, path, key):
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        # the meta file is written last, it marks a complete pyramid
+
+        meta_file = os.path.join(path, 'meta.json')
+
+        if os.path.exists(meta_file):
+            os.remove(meta_file)
+
+        def allocate(level, n, dtype):
+            return open_memmap(
+                _level_file(path, level),
+                mode = 'w+',
+                dtype = dtype,
+                shape = (n,),
+            )
+
+        levels = build_levels(self._y, FACTOR, self._first_level, allocate)
+
+        for level in levels:
+            level.flush()
+
+        with open(meta_file, 'w') as fd:
+            json.dump(dict(key = key, levels = len(levels)), fd)
+
+        return levels
+
+
+    def _key(self):
+        """
+        Identifies the data the pyramid was built from.
+        """
+
+        y = self._y
+
+        key = dict(
+            n = len(y),
+            dtype = str(y.dtype),
+            offset = int(getattr(y, 'offset', 0)),
+            factor = FACTOR,
+            first_level = self._first_level,
+        )
+
+        filename = getattr(y, 'filename', None)
+
+        if filename:
+            st = os.stat(filename)
+            key.update(size = st.st_size, mtime = st.st_mtime)
+
+        return key
+
+
+def open_recording(path, dtype = np.float32, offset = 0, **kwargs):
+    """
+    Memory-maps a raw binary file of samples, returns a MemmapSource, the
+    kwargs are those of MemmapSource.
+    """
+
+    y = np.memmap(path, dtype = dtype, mode = 'r', offset = offset)
+
+    return MemmapSource(y, **kwargs)
+
+
+class PagedArray(object):
+    """
+    Read access to a large 1D array, e.g. a memmap, through pages of
+    page_size entries copied into an LRUCache on first use, under the keys
+    (key, page number).  Index arrays must be non-negative.
+    """
+
+    ndim = 1
+
+
+    def __init__(self, array, cache, key, page_size = MemmapSource.PAGE_SIZE):
+
+        self._array = array
+        self._cache = cache
+        self._key = key
+        self._page_size = page_size
+
+        self.dtype = array.dtype
+
+
+    def __len__(self):
+        return len(self._array)
+
+
+    def __getitem__(self, index):
+
+        # slices are contiguous, read directly
+
+        if isinstance(index, slice):
+            return np.array(self._array[index])
+
+        idx = np.asarray(index)
+
+        if idx.ndim == 0:
+            return self._array[int(index)]
+
+        if not idx.size:
+            return np.empty(idx.shape, dtype = self.dtype)
+
+        size = self._page_size
+
+        pages, inverse = np.unique(idx // size, return_inverse = True)
+
+        # the pages used side by side, then gathered at once, copied as raw
+        # bytes which is much faster than field by field for records
+
+        raw = np.dtype((np.void, self.dtype.itemsize))
+
+        buf = np.empty((len(pages), size), dtype = raw)
+
+        for j, page in enumerate(pages.tolist()):
+            data = self._page(page)
+            buf[j, :len(data)] = data.view(raw)
+
+        return buf.view(self.dtype)[inverse.reshape(idx.shape), idx % size]
+
+
+    def searchsorted(self, v, side = 'left'):
+        return self._array.searchsorted(v, side = side)
+
+
+    def _page(self, page):
+
+        key = (self._key, page)
+
+        data = self._cache.get(key)
+
+        if data is None:
+
+            i0 = page * self._page_size
+
+            data = np.array(self._array[i0:i0 + self._page_size])
+
+            self._cache.put(key, data)
+
+        return data
+
+
+class UniformAxis(object):
+    """
+    The x values x0 + i * dx of n uniformly spaced samples, indexable like
+    an array without storing them.
+    """
+
+    ndim = 1
+
+
+    def __init__(self, x0, dx, n):
+
+        if dx <= 0:
+            raise ValueError('dx must be positive')
+
+        self._x0 = x0
+        self._dx = dx
+        self._n = n
+
+
+    def __len__(self):
+        return self._n
+
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(self._n))
+
+        elif np.ndim(index) == 0 and index < 0:
+            index += self._n
+
+        return self._x0 + np.asarray(index) * self._dx
+
+
+    def searchsorted(self, v, side = 'left'):
+
+        v = np.asarray(v, dtype = float)
+
+        i = np.ceil((v - self._x0) / self._dx)
+
+        i = np.clip(i, 0, self._n).astype(np.int64)
+
+        # corrects the rounding of the division against the x values, so the
+        # result agrees with searching the array of x values
+
+        if side == 'left':
+            below = lambda i: self._x0 + i * self._dx < v
+        else:
+            below = lambda i: self._x0 + i * self._dx <= v
+
+        i = np.where((i > 0) & ~below(i - 1), i - 1, i)
+        i = np.where((i < self._n) & below(i), i + 1, i)
+
+        return i
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _level_file(path, level):
+    return os.path.join(path, 'level%d.npy' % level)
@@ -0,0 +1,353 @@
+"""
+Min/max decimation of large series for display.
+
+A line through N samples drawn into W pixel columns covers the same pixels
+as a line through the first, min, max and last samples of each column, in
+sample order, which is at most 4 * W vertices however large N is.
+
+The MinMaxPyramid precomputes the index and the value of the min and the
+max of blocks of FACTOR ** level samples, in one record array per level.
+The exact min and max of a column are found by peeling the partial blocks
+off both ends of its sample range, level by level up to the coarsest level
+with blocks no larger than the column, for all the columns at once, so the
+cost only depends on the number of columns.
+"""
+
+import numpy as np
+
+
+FACTOR = 4
+
+LEVEL_FIELDS = ('argmin', 'min', 'argmax', 'max')
+
+
+class MinMaxPyramid(object):
+    """
+    Multi-resolution min/max index of y(x), x sorted ascending.
+
+    x and y may be anything indexable like a 1D array that has a length and
+    ndim, e.g. a memmap.  levels are the record arrays of the levels from
+    first_level up, as returned by build_levels(), built from y when None.
+    The levels below first_level aren't stored, their blocks are reduced
+    from the samples when needed.
+    """
+
+    def __init__(self, x, y, factor = FACTOR, levels = None, first_level = 1):
+
+        x = _as_array(x)
+        y = _as_array(y)
+
+        if len(x) != len(y) or y.ndim != 1:
+            raise ValueError('x and y must be 1D arrays of the same length')
+
+        if first_level < 1:
+            raise ValueError('first_level must be at least 1')
+
+        self._x = x
+        self._y = y
+        self._factor = factor
+        self._first = first_level
+
+        if levels is None:
+            levels = build_levels(y, factor, first_level)
+
+        self._levels = levels
+
+
+    def __len__(self):
+        return len(self._x)
+
+
+    def levels(self):
+        return self._first + len(self._levels)
+
+
+    def x_range(self):
+        return self._x[0], self._x[-1]
+
+
+    def y_range(self):
+
+        if not self._levels:
+            y = self._y[0:len(self._y)]
+            return y.min(), y.max()
+
+        top = self._levels[-1]
+        top = top[0:len(top)]
+
+        return top['min'].min(), top['max'].max()
+
+
+    def envelope(self, x0, x1, n_columns):
+        """
+        Returns the x, y vertices to draw for the range [x0, x1] spread over
+        n_columns pixel columns.
+        """
+
+        x = self._x
+        y = self._y
+
+        n_columns = max(int(n_columns), 1)
+
+        # one sample beyond each side so the line reaches the axes edges
+
+        i0 = max(int(x.searchsorted(x0, side = 'left')) - 1, 0)
+        i1 = min(int(x.searchsorted(x1, side = 'right')) + 1, len(x))
+
+        n = i1 - i0
+
+        if n <= 4 * n_columns:
+            return x[i0:i1], y[i0:i1]
+
+        # sample index of each column edge
+
+        edges = x.searchsorted(np.linspace(x0, x1, n_columns + 1))
+
+        edges[0] = i0
+        edges[-1] = i1
+
+        # columns without samples are skipped
+
+        keep = edges[1:] > edges[:-1]
+
+        lo = edges[:-1][keep]
+        hi = edges[1:][keep]
+
+        imin, vmin, imax, vmax = self._reduce(lo, hi, float(n) / n_columns)
+
+        # each column is drawn through its first sample, min, max and last
+        # sample in sample order, so the line joins the same samples as the
+        # full resolution line at the column edges and the extremes
+
+        swap = imax < imin
+
+        idx = np.empty(4 * len(lo), dtype = lo.dtype)
+
+        idx[0::4] = lo
+        idx[1::4] = np.where(swap, imax, imin)
+        idx[2::4] = np.where(swap, imin, imax)
+        idx[3::4] = hi - 1
+
+        ends = y[np.concatenate([lo, hi - 1])]
+
+        yv = np.empty(4 * len(lo), dtype = ends.dtype)
+
+        yv[0::4] = ends[:len(lo)]
+        yv[1::4] = np.where(swap, vmax, vmin)
+        yv[2::4] = np.where(swap, vmin, vmax)
+        yv[3::4] = ends[len(lo):]
+
+        return x[idx], yv
+
+
+    def _reduce(self, lo, hi, per_column):
+        """
+        Returns the sample indices and values of the exact min & max of
+        y[lo:hi] for each pair of sample indices.
+        """
+
+        f = self._factor
+
+        lo = lo.copy()
+        hi = hi.copy()
+
+        imin = lo.copy()
+        imax = lo.copy()
+
+        vmin = np.full(len(lo), np.inf)
+        vmax = np.full(len(lo), -np.inf)
+
+        def take(level, idx, m):
+
+            cmin, cvmin, cmax, cvmax = self._extremes(level, idx)
+
+            better = cvmin < vmin[m]
+            imin[m] = np.where(better, cmin, imin[m])
+            vmin[m] = np.where(better, cvmin, vmin[m])
+
+            better = cvmax > vmax[m]
+            imax[m] = np.where(better, cmax, imax[m])
+            vmax[m] = np.where(better, cvmax, vmax[m])
+
+        level = 0
+
+        while level + 1 < self.levels() and f ** (level + 1) <= per_column:
+
+            # peel partial blocks until both ends align with the next level
+
+            for _ in range(f - 1):
+
+                m = (lo % f != 0) & (lo < hi)
+
+                take(level, lo[m], m)
+
+                lo[m] += 1
+
+                m = (hi % f != 0) & (lo < hi)
+
+                hi[m] -= 1
+
+                take(level, hi[m], m)
+
+            lo //= f
+            hi //= f
+
+            level += 1
+
+        # only a few whole blocks are left per column at this level
+
+        while True:
+
+            m = lo < hi
+
+            if not m.any():
+                break
+
+            take(level, lo[m], m)
+
+            lo[m] += 1
+
+        return imin, vmin, imax, vmax
+
+
+    def _extremes(self, level, idx):
+        """
+        Returns the sample index and value of the min & max of the blocks idx
+        of the level.
+        """
+
+        if level == 0:
+            v = self._y[idx]
+            return idx, v, idx, v
+
+        if level >= self._first:
+            e = self._levels[level - self._first][idx]
+            return tuple(e[name] for name in LEVEL_FIELDS)
+
+        # not stored, reduced from the samples
+
+        size = self._factor ** level
+
+        i = idx[:, None] * size + np.arange(size)
+
+        v = self._y[i.ravel()].reshape(i.shape)
+
+        rows = np.arange(len(i))
+
+        pmin = v.argmin(axis = 1)
+        pmax = v.argmax(axis = 1)
+
+        return i[rows, pmin], v[rows, pmin], i[rows, pmax], v[rows, pmax]
+
+
+def build_levels(y, factor = FACTOR, first_level = 1, allocate = None):
+    """
+    Returns the pyramid levels of y from first_level up, record arrays with
+    the LEVEL_FIELDS, reading y in chunks so it may be a memmap larger than
+    memory.  allocate(level, n, dtype) returns the array to fill, level
+    counted from first_level, np.empty by default.
+    """
+
+    if allocate is None:
+        allocate = lambda level, n, dtype: np.empty(n, dtype = dtype)
+
+    n = len(y)
+
+    idx_dtype = np.int32 if n < 2 ** 31 else np.int64
+
+    dtype = np.dtype(list(zip(
+        LEVEL_FIELDS, [idx_dtype, y.dtype, idx_dtype, y.dtype])))
+
+    levels = []
+
+    prev = None
+
+    # blocks of the samples straight to first_level, then factor at a time
+
+    step = factor ** first_level
+
+    m = n
+
+    while m > step:
+
+        level = allocate(len(levels), -(-m // step), dtype)
+
+        for arg, i, v in [
+                (np.argmin, 'argmin', 'min'),
+                (np.argmax, 'argmax', 'max'),
+            ]:
+
+            if prev is None:
+                args, values = None, y
+            else:
+                args, values = prev[i], prev[v]
+
+            _reduce_level(args, values, step, arg, level[i], level[v])
+
+        levels.append(level)
+
+        prev = level
+        step = factor
+
+        m = len(level)
+
+    return levels
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+CHUNK = 2 ** 20 # source entries reduced at a time
+
+
+def _reduce_level(args, values, step, arg, out_args, out_values):
+    """
+    Reduces groups of step entries to the index and value of their min or
+    max, arg.  args are the sample indices of the values, None when the
+    values are the samples.
+    """
+
+    n = len(values)
+
+    chunk = max(CHUNK // step, 1)
+
+    for j0 in range(0, len(out_args), chunk):
+
+        j1 = min(j0 + chunk, len(out_args))
+
+        s0 = j0 * step
+        s1 = min(j1 * step, n)
+
+        v = np.asarray(values[s0:s1])
+
+        if args is None:
+            a = np.arange(s0, s1, dtype = out_args.dtype)
+        else:
+            a = np.asarray(args[s0:s1])
+
+        # the last group is padded with its last entry, arg() returns the
+        # first occurrence so the padding is never picked
+
+        pad = (j1 - j0) * step - len(v)
+
+        if pad:
+            v = np.append(v, np.repeat(v[-1:], pad))
+            a = np.append(a, np.repeat(a[-1:], pad))
+
+        v = v.reshape(-1, step)
+        a = a.reshape(-1, step)
+
+        rows = np.arange(len(v))
+
+        pick = arg(v, axis = 1)
+
+        out_args[j0:j1] = a[rows, pick]
+        out_values[j0:j1] = v[rows, pick]
+
+
+def _as_array(a):
+
+    if hasattr(a, 'ndim') and hasattr(a, '__getitem__'):
+        return a
+
+    return np.asarray(a)
@@ -0,0 +1,238 @@
+MOUSE_EVENTS = [
+    'button_press_event',
+    'button_release_event',
+    'motion_notify_event',
+    'scroll_event',
+]
+
+KEY_EVENTS = [
+    'key_press_event',
+    'key_release_event',
+]
+
+
+class EventDispatcher(object):
+    """
+    Routes canvas events to widgets.
+
+    Only one matplotlib callback is connected per event type.  Mouse events
+    are delivered to the widgets under the pointer, found with a SpatialIndex
+    built from the widgets' axes, so the cost of an event doesn't grow with the
+    number of widgets in the window.
+
+    A widget may capture the pointer, e.g. a Slider being dragged or an open
+    ComboBox dropdown, then it receives all mouse events until it releases
+    the capture.
+
+    Key events are only delivered to the widget focused in the FocusManager.
+    """
+
+    def __init__(self, canvas, focus):
+
+        self._canvas = canvas
+        self._focus = focus
+
+        self._handlers = {}    # event name -> {widget : [handler, ...]}
+        self._mpl_cids = {}    # event name -> matplotlib callback id
+        self._connections = {} # cid -> (event name, widget, handler)
+        self._next_cid = 0
+
+        self._index = SpatialIndex()
+        self._index_size = None
+
+        self._captured = None
+
+
+    def connect(self, widget, name, handler):
+        """
+        Calls handler(event) when the event is routed to the widget, returns a
+        connection id.
+        """
+
+        if name not in self._mpl_cids:
+            self._mpl_cids[name] = self._canvas.mpl_connect(
+                name, self._on_event)
+
+        handlers = self._handlers.setdefault(name, {})
+
+        handlers.setdefault(widget, []).append(handler)
+
+        cid = self._next_cid
+        self._next_cid += 1
+
+        self._connections[cid] = (name, widget, handler)
+
+        # the widget may be new, rebuild the index on the next event
+        self._index_size = None
+
+        return cid
+
+
+    def disconnect(self, cid):
+
+        name, widget, handler = self._connections.pop(cid)
+
+        lst = self._handlers[name][widget]
+
+        lst.remove(handler)
+
+        if not lst:
+            del self._handlers[name][widget]
+
+
+    def capture(self, widget):
+        """
+        Routes all mouse events to the widget until release() is called.
+        """
+        self._captured = widget
+
+
+    def release(self, widget):
+
+        if self._captured is widget:
+            self._captured = None
+
+
+    def captured(self):
+        return self._captured
+
+
+    def widgets_at(self, x, y):
+        """
+        Returns the widgets under the pixel position x, y.
+        """
+
+        size = tuple(self._canvas.figure.bbox.size)
+
+        if size != self._index_size:
+            self._build_index()
+            self._index_size = size
+
+        return self._index.query(x, y)
+
+
+    def _build_index(self):
+
+        items = []
+
+        widgets = set()
+
+        for name in MOUSE_EVENTS:
+            widgets.update(self._handlers.get(name, {}))
+
+        for widget in widgets:
+            for ax in widget._hit_axes():
+                items.append((ax, widget))
+
+        self._index.build(items)
+
+
+    def _on_event(self, event):
+
+        # looked up on each event, so that mplapp.instrument can time it
+
+        self._dispatch(event)
+
+
+    def _dispatch(self, event):
+
+        name = event.name
+
+        handlers = self._handlers.get(name, None)
+
+        if not handlers:
+            return
+
+        if name in KEY_EVENTS:
+
+            if name == 'key_press_event' and self._focus.on_key_press(event):
+                return
+
+            focused = self._focus.focused()
+
+            if focused is None:
+                return
+
+            targets = [focused]
+
+        else:
+
+            if name == 'button_press_event':
+
+                # update the focus first, losing focus may release a capture
+
+                self._focus.on_click(self.widgets_at(event.x, event.y))
+
+            if self._captured is not None:
+                targets = [self._captured]
+
+            else:
+                targets = self.widgets_at(event.x, event.y)
+
+        for widget in targets:
+            for handler in list(handlers.get(widget, [])):
+                self._handle(widget, handler, event)
+
+
+    def _handle(self, widget, handler, event):
+        """
+        Calls one of the widget's handlers, mplapp.instrument times it.
+        """
+        handler(event)
+
+
+#------------------------------------------------------------------------------
+# Support classes
+
+class SpatialIndex(object):
+    """
+    A uniform grid over the figure in pixel space, each cell lists the axes
+    that overlap it.
+    """
+
+    CELL_SIZE = 32 # pixels
+
+
+    def __init__(self, cell_size = CELL_SIZE):
+        self._cell_size = float(cell_size)
+        self._grid = {}
+
+
+    def build(self, items):
+        """
+        items is a list of (axes, widget) tuples.
+        """
+
+        self._grid = {}
+
+        c = self._cell_size
+
+        for ax, widget in items:
+
+            x0, y0, x1, y1 = ax.bbox.extents
+
+            for i in range(int(x0 // c), int(x1 // c) + 1):
+                for j in range(int(y0 // c), int(y1 // c) + 1):
+                    self._grid.setdefault((i, j), []).append((ax, widget))
+
+
+    def query(self, x, y):
+        """
+        Returns the widgets whose visible axes contain the point x, y.
+        """
+
+        c = self._cell_size
+
+        hits = []
+
+        for ax, widget in self._grid.get((int(x // c), int(y // c)), []):
+
+            if widget in hits or not ax.get_visible():
+                continue
+
+            x0, y0, x1, y1 = ax.bbox.extents
+
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                hits.append(widget)
+
+        return hits
@@ -0,0 +1,100 @@
+class FocusManager(object):
+    """
+    Keeps track of the one widget with keyboard focus.
+
+    Key events are only delivered to the focused widget.  Clicking a widget
+    focuses it, clicking anything else clears the focus, and Tab/Shift-Tab
+    move the focus through the focusable widgets in layout order.
+
+    Widgets opt in by setting _focusable = True and implementing
+    _focus_in(reason) and _focus_out().
+    """
+
+    # key None, which some backends deliver for keys they don't recognise,
+    # isn't taken as Tab, it would move the focus on any of them
+
+    NEXT_KEYS = ['tab']
+    PREVIOUS_KEYS = ['shift+tab', 'backtab']
+
+
+    def __init__(self):
+        self._focused = None
+        self._order = []
+
+
+    def set_order(self, widgets):
+        """
+        Sets the Tab traversal order, non focusable widgets are skipped.
+        """
+        self._order = [w for w in widgets if w._focusable]
+
+
+    def focused(self):
+        return self._focused
+
+
+    def focus(self, widget, reason = 'other'):
+        """
+        Moves the focus to the widget, or clears it if widget is None.
+        """
+
+        if widget is self._focused:
+            return
+
+        old = self._focused
+
+        self._focused = widget
+
+        if old is not None:
+            old._focus_out()
+
+        if widget is not None:
+            widget._focus_in(reason)
+
+
+    def focus_next(self, step = 1):
+
+        N = len(self._order)
+
+        if N == 0:
+            return
+
+        if self._focused in self._order:
+            idx = (self._order.index(self._focused) + step) % N
+
+        elif step > 0:
+            idx = 0
+
+        else:
+            idx = N - 1
+
+        self.focus(self._order[idx], 'tab')
+
+
+    def on_click(self, widgets):
+        """
+        Called with the widgets under the pointer on a button press.
+        """
+
+        for widget in widgets:
+            if widget._focusable:
+                self.focus(widget, 'mouse')
+                return
+
+        self.focus(None, 'mouse')
+
+
+    def on_key_press(self, event):
+        """
+        Handles focus traversal keys, returns True if the event was consumed.
+        """
+
+        if event.key in self.NEXT_KEYS:
+            self.focus_next(1)
+            return True
+
+        if event.key in self.PREVIOUS_KEYS:
+            self.focus_next(-1)
+            return True
+
+        return False
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+
+
+class History(object):
+    """
+    An ordered list of unique strings with an optional capacity.
+
+    Duplicates are detected in O(1) with a dict.  When the capacity is
+    exceeded the least recently used items are evicted, so memory stays
+    bounded however many items are added over a session.
+
+    The display order is an OrderedDict, adding, using and evicting items
+    is O(1).  Reading items by position, or index(), uses a list of the
+    display order rebuilt on the first read after a change.
+
+    With move_to_top = True, new items and used items move to the front of
+    the list, otherwise new items are appended and items keep their place.
+    """
+
+    def __init__(self, items = (), capacity = None, move_to_top = False):
+
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be at least 1')
+
+        self._capacity = capacity
+        self._move_to_top = move_to_top
+
+        self._order = OrderedDict() # item -> None, display order
+        self._lru = OrderedDict()   # item -> None, least recently used first
+
+        # the display order as a list and item -> position, None if stale
+
+        self._list = None
+        self._positions = None
+
+        # the order of each item in the display order, for sorting subsets
+
+        self._ranks = {}
+        self._first = 0
+        self._last = -1
+
+        for item in items:
+
+            if item in self._ranks:
+                continue
+
+            self._last += 1
+            self._ranks[item] = self._last
+            self._order[item] = None
+            self._lru[item] = None
+
+        self._evict()
+
+
+    def __len__(self):
+        return len(self._order)
+
+
+    def __getitem__(self, i):
+        return self._snapshot()[i]
+
+
+    def __iter__(self):
+        return iter(self._order)
+
+
+    def __contains__(self, item):
+        return item in self._ranks
+
+
+    def index(self, item):
+
+        self._snapshot()
+
+        try:
+            return self._positions[item]
+
+        except KeyError:
+            raise ValueError('%s is not in the history' % repr(item))
+
+
+    def rank(self, item):
+        """
+        Returns a number that sorts the items in display order.
+        """
+        return self._ranks[item]
+
+
+    def add(self, item):
+        """
+        Adds or uses the item, returns the list of evicted items.
+        """
+
+        if item in self._ranks:
+            self.touch(item)
+            return []
+
+        self._order[item] = None
+
+        if self._move_to_top:
+            self._first -= 1
+            self._ranks[item] = self._first
+            self._order.move_to_end(item, last = False)
+
+        else:
+            self._last += 1
+            self._ranks[item] = self._last
+
+        self._lru[item] = None
+
+        self._list = None
+
+        return self._evict()
+
+
+    def touch(self, item):
+        """
+        Marks the item as the most recently used.
+        """
+
+        self._lru.move_to_end(item)
+
+        if self._move_to_top and next(iter(self._order)) != item:
+            self._order.move_to_end(item, last = False)
+            self._first -= 1
+            self._ranks[item] = self._first
+            self._list = None
+
+
+    def _evict(self):
+
+        evicted = []
+
+        if self._capacity is None:
+            return evicted
+
+        while len(self._order) > self._capacity:
+
+            item, _ = self._lru.popitem(last = False)
+
+            del self._ranks[item]
+            del self._order[item]
+
+            self._list = None
+
+            evicted.append(item)
+
+        return evicted
+
+
+    def _snapshot(self):
+        """
+        Returns the display order as a list.
+        """
+
+        if self._list is None:
+            self._list = list(self._order)
+            self._positions = dict(
+                (item, i) for i, item in enumerate(self._list))
+
+        return self._list
@@ -66,6 +66,10 @@ class HorizontalBox(Base):
         raise RuntimeError('VericalBox does not have a canvas')
 
 
+    def _children(self):
+        return [widget for widget, _ in self._widgets]
+
+
     def size(self):
         """
         Returns the minimum size of this box in inches.
@@ -0,0 +1,414 @@
+"""
+Opt-in timing of event dispatch, widget renders, event handlers, state
+transitions, user callbacks and canvas draws.
+
+    from mplapp import instrument
+
+    instrument.enable()
+    ...
+    plt.show()
+
+    print(instrument.report(window))
+
+enable() wraps the instrumented methods with timers and disable() puts the
+originals back, so a disabled app runs the unwrapped code.  Each timed call
+is recorded as an event (kind, widget type, widget id, name, start,
+duration) in a ring buffer of the latest events, and its duration is
+aggregated per (kind, widget type, name) into a count, a total and p50 /
+p99 over the latest samples.
+
+The kinds are:
+
+    dispatch    EventDispatcher._dispatch, routing one canvas event
+    render      Base._render of every widget class
+    event       handlers called by the EventDispatcher, named by event
+    state       LineEdit._change_state, ComboBox._cb_change_state
+    callback    user callbacks called through Base._invoke
+    text        LineEdit._char_positions, text layout and measurement
+    prepare     Base._prepare_draw before a scheduled repaint
+    flush       RedrawScheduler.flush, the coalesced draw or blit
+    repaint     Window._repaint, the restore and draw of a blitted widget
+    draw        Figure.draw, every full draw of a Window's figure
+
+Calls made within a timed call are nested in it, see mplapp.trace.
+
+Other methods are timed with watch().  Coroutine callbacks are only timed
+up to their first suspension.
+"""
+
+import collections
+import functools
+import time
+
+
+import numpy as np
+from matplotlib.figure import Figure
+
+
+from mplapp.ring_buffer import RingBuffer
+
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+EVENTS = 10000   # events kept in the ring buffer
+SAMPLES = 1024   # latest durations kept per aggregate for percentiles
+
+
+def enable(events = EVENTS, samples = SAMPLES):
+    """
+    Starts timing, clearing the previous records.  If a method can't be
+    wrapped, none are.
+    """
+
+    global _recorder
+
+    disable()
+
+    _recorder = _Recorder(events, samples)
+
+    try:
+        for entry in _defaults() + _watched:
+            _patch(*entry)
+
+    except Exception:
+        disable()
+        raise
+
+
+def disable():
+    """
+    Stops timing and restores the original methods, the records are kept.
+    """
+
+    while _patches:
+
+        owner, attr, original = _patches.pop()
+
+        # an inherited method was wrapped in owner, remove the wrapper
+
+        if original is None:
+            delattr(owner, attr)
+
+        else:
+            setattr(owner, attr, original)
+
+
+def enabled():
+    return bool(_patches)
+
+
+def reset():
+    """
+    Clears the records.
+    """
+
+    if _recorder is not None:
+        _recorder.clear()
+
+
+def watch(owner, attr, kind, name = None, widget_arg = 0):
+    """
+    Times owner.attr, a method of the class owner or inherited by it, as
+    kind.  The argument widget_arg of the calls, self by default, is taken
+    as the widget.  name defaults to attr, or is a function name(attr,
+    args) of the call's arguments, returning None to not record the call.
+    """
+
+    _method(owner, attr)
+
+    entry = (owner, attr, kind, name, widget_arg)
+
+    _watched.append(entry)
+
+    if enabled():
+        _patch(*entry)
+
+
+def events():
+    """
+    Returns the latest events, oldest first, as a list of (kind, widget
+    type, widget id, name, start, duration) tuples, times in seconds.
+    """
+
+    if _recorder is None:
+        return []
+
+    return list(_recorder.events)
+
+
+def stats():
+    """
+    Returns a dict mapping 'kind widget_type.name' to a dict with the count,
+    total, max, p50 and p99 durations in milliseconds, the percentiles over
+    the latest samples.
+    """
+
+    if _recorder is None:
+        return {}
+
+    out = {}
+
+    for key, agg in _recorder.aggregates.items():
+
+        kind, wtype, name = key
+
+        ms = 1000.0 * agg.samples.view()
+
+        p50, p99 = np.percentile(ms, [50, 99])
+
+        out['%s %s.%s' % (kind, wtype, name)] = dict(
+            count = agg.count,
+            total = 1000.0 * agg.total,
+            max = 1000.0 * agg.max,
+            p50 = p50,
+            p99 = p99,
+        )
+
+    return out
+
+
+def report(window = None):
+    """
+    Returns the timings as a table, slowest total first, followed by the
+    statistics of the Window's redraw scheduler and call queue, the Memo
+    caches and the binding graph.
+    """
+
+    # only imported to report on them
+
+    from mplapp import binding
+    from mplapp import memo
+
+    lines = ['%-56s %8s %10s %9s %9s %9s' % (
+        'timer', 'count', 'total ms', 'p50 ms', 'p99 ms', 'max ms')]
+
+    rows = sorted(stats().items(), key = lambda kv: -kv[1]['total'])
+
+    for key, s in rows:
+        lines.append('%-56s %8d %10.2f %9.3f %9.3f %9.3f' % (
+            key, s['count'], s['total'], s['p50'], s['p99'], s['max']))
+
+    if window is not None:
+        lines.append('redraws:    %s' % window.redraw_stats())
+        lines.append('call_soon:  %s' % window.call_soon_stats())
+
+    for s in memo.all_stats():
+        lines.append('memo:       %s' % s)
+
+    lines.append('binding:    %s' % binding.stats())
+
+    return '\n'.join(lines)
+
+
+#------------------------------------------------------------------------------
+# Support classes
+
+class _Aggregate(object):
+
+    def __init__(self, samples):
+
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = RingBuffer(samples)
+
+
+class _Recorder(object):
+
+    def __init__(self, events, samples):
+
+        self._samples = samples
+
+        self.events = collections.deque(maxlen = events)
+        self.aggregates = {}  # (kind, widget type, name) -> _Aggregate
+
+
+    def record(self, kind, widget, name, start, duration):
+
+        wtype = type(widget).__name__
+
+        self.events.append((kind, wtype, id(widget), name, start, duration))
+
+        key = (kind, wtype, name)
+
+        agg = self.aggregates.get(key, None)
+
+        if agg is None:
+            agg = self.aggregates[key] = _Aggregate(self._samples)
+
+        agg.count += 1
+        agg.total += duration
+        agg.samples.append(duration)
+
+        if duration > agg.max:
+            agg.max = duration
+
+
+    def clear(self):
+        self.events.clear()
+        self.aggregates = {}
+
+
+_recorder = None
+
+_watched = []  # (owner, attr, kind, name, widget_arg)
+_patches = []  # (owner, attr, original)
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _defaults():
+    """
+    Returns the watch entries of the methods listed in the module docstring,
+    the widget classes are those imported when timing is enabled.
+    """
+
+    # imported here so that the widget modules may import this one
+
+    from mplapp.base import Base
+    from mplapp.combo_box import ComboBox
+    from mplapp.dispatcher import EventDispatcher
+    from mplapp.line_edit import LineEdit
+    from mplapp.scheduler import RedrawScheduler
+    from mplapp.window import Window
+
+    entries = [
+        (EventDispatcher, '_dispatch', 'dispatch', _dispatch_name, 0),
+        (EventDispatcher, '_handle', 'event', _event_name, 1),
+        (LineEdit, '_change_state', 'state', _state_name, 0),
+        (ComboBox, '_cb_change_state', 'state', _state_name, 0),
+        (Base, '_invoke', 'callback', _callback_name, 0),
+        (LineEdit, '_char_positions', 'text', None, 0),
+        (RedrawScheduler, 'flush', 'flush', None, 0),
+        (Window, '_repaint', 'repaint', None, 0),
+        (Figure, 'draw', 'draw', _draw_name, 0),
+    ]
+
+    # a subclass method calling its base's is timed as both, the base's
+    # named after its class
+
+    for cls in _subclasses(Base):
+
+        name = functools.partial(_method_name, cls)
+
+        if '_render' in vars(cls):
+            entries.append((cls, '_render', 'render', name, 0))
+
+        if '_prepare_draw' in vars(cls):
+            entries.append((cls, '_prepare_draw', 'prepare', name, 0))
+
+    return entries
+
+
+def _method(owner, attr):
+    """
+    Returns owner.attr, raises ValueError if it isn't a method.
+    """
+
+    method = getattr(owner, attr, None)
+
+    if not callable(method):
+        raise ValueError('%s.%s is not a method' % (owner.__name__, attr))
+
+    return method
+
+
+def _patch(owner, attr, kind, name, widget_arg):
+
+    method = _method(owner, attr)
+
+    # None if inherited
+
+    original = vars(owner).get(attr, None)
+
+    if name is None:
+        name = attr
+
+    if callable(name):
+        name_of = functools.partial(name, attr)
+
+    else:
+        name_of = lambda args: name
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+
+        start = _clock()
+
+        try:
+            return method(*args, **kwargs)
+
+        finally:
+
+            duration = _clock() - start
+
+            call_name = name_of(args)
+
+            if call_name is not None:
+                _recorder.record(
+                    kind, args[widget_arg], call_name, start, duration)
+
+    setattr(owner, attr, timed)
+
+    _patches.append((owner, attr, original))
+
+
+def _subclasses(cls):
+
+    out = []
+
+    for sub in cls.__subclasses__():
+        for c in [sub] + _subclasses(sub):
+            if c not in out:
+                out.append(c)
+
+    return out
+
+
+def _method_name(cls, attr, args):
+
+    if type(args[0]) is cls:
+        return attr
+
+    return '%s.%s' % (cls.__name__, attr)
+
+
+def _draw_name(attr, args):
+
+    # other figures than the Windows' aren't timed
+
+    from mplapp.window import Window
+
+    if Window.find(args[0]) is None:
+        return None
+
+    return attr
+
+
+def _dispatch_name(attr, args):
+    return args[1].name
+
+
+def _event_name(attr, args):
+
+    # EventDispatcher._handle(self, widget, handler, event)
+
+    return '%s:%s' % (args[3].name, getattr(args[2], '__name__', 'handler'))
+
+
+def _state_name(attr, args):
+
+    state = args[1]
+
+    return '%s(%s)' % (attr, getattr(state, 'name', state))
+
+
+def _callback_name(attr, args):
+
+    # functools.partial objects have no name
+
+    func = getattr(args[1], 'func', args[1])
+
+    return getattr(func, '__name__', 'callback')
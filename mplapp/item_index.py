@@ -0,0 +1,195 @@
+import bisect
+
+
+class ItemIndex(object):
+    """
+    Indexes a list of strings for fast, case insensitive, type-ahead search.
+
+    Every item gets an id, ids of removed items are reused so the index
+    stays bounded when items are added and removed over a long session.
+    Prefix searches bisect a sorted list of (key, id) pairs, O(log N + k) for
+    k matches.  Substring searches look up the posting set of every 1 to n
+    character gram, queries longer than n intersect the postings of their
+    n-grams so only the items sharing all of them are compared.  The n-gram
+    index is only built if substring = True.
+
+    Items can be added and removed incrementally.
+    """
+
+    NGRAM = 3
+
+
+    def __init__(self, items = (), substring = False, ngram = NGRAM):
+
+        self._ngram = ngram
+        self._substring = substring
+
+        self._items = []   # id -> item, None once removed
+        self._keys = []    # id -> lower case key
+        self._ids = {}     # item -> [id, ...]
+        self._sorted = []  # [(key, id), ...] sorted
+        self._grams = {}   # n-gram -> set of ids
+        self._free = []    # ids of removed items
+        self._count = 0
+
+        # bulk load, sorted once
+
+        for item in items:
+            self._sorted.append(self._append(item))
+
+        self._sorted.sort()
+
+
+    def __len__(self):
+        return self._count
+
+
+    def __contains__(self, item):
+        return item in self._ids
+
+
+    def item(self, item_id):
+        return self._items[item_id]
+
+
+    def add(self, item):
+        """
+        Adds the item, returns its id.
+        """
+
+        key, item_id = self._append(item)
+
+        bisect.insort(self._sorted, (key, item_id))
+
+        return item_id
+
+
+    def _append(self, item):
+
+        key = item.lower()
+
+        if self._free:
+            item_id = self._free.pop()
+            self._items[item_id] = item
+            self._keys[item_id] = key
+
+        else:
+            item_id = len(self._items)
+            self._items.append(item)
+            self._keys.append(key)
+        self._ids.setdefault(item, []).append(item_id)
+
+        if self._substring:
+            for gram in _grams(key, self._ngram):
+                self._grams.setdefault(gram, set()).add(item_id)
+
+        self._count += 1
+
+        return key, item_id
+
+
+    def remove(self, item):
+        """
+        Removes the most recently added copy of the item, returns its id.
+        """
+
+        ids = self._ids[item]
+
+        item_id = ids.pop()
+
+        if not ids:
+            del self._ids[item]
+
+        key = self._keys[item_id]
+
+        i = bisect.bisect_left(self._sorted, (key, item_id))
+
+        del self._sorted[i]
+
+        if self._substring:
+
+            for gram in _grams(key, self._ngram):
+
+                posting = self._grams[gram]
+
+                posting.discard(item_id)
+
+                if not posting:
+                    del self._grams[gram]
+
+        self._items[item_id] = None
+        self._keys[item_id] = None
+
+        self._free.append(item_id)
+
+        self._count -= 1
+
+        return item_id
+
+
+    def prefix(self, query):
+        """
+        Returns the ids of the items starting with query, in sorted order.
+        """
+
+        query = query.lower()
+
+        i0 = bisect.bisect_left(self._sorted, (query,))
+        i1 = bisect.bisect_left(self._sorted, (query + u'\uffff',))
+
+        return [item_id for _, item_id in self._sorted[i0:i1]]
+
+
+    def substring(self, query):
+        """
+        Returns the ids of the items containing query, in id order.
+        """
+
+        if not self._substring:
+            raise RuntimeError('the substring index was not built')
+
+        query = query.lower()
+
+        n = self._ngram
+
+        if len(query) <= n:
+            return sorted(self._grams.get(query, ()))
+
+        postings = [
+            self._grams.get(query[i:i + n], None)
+            for i in range(len(query) - n + 1)
+        ]
+
+        if None in postings:
+            return []
+
+        postings.sort(key = len)
+
+        candidates = set(postings[0])
+
+        for posting in postings[1:]:
+
+            candidates &= posting
+
+            if not candidates:
+                return []
+
+        keys = self._keys
+
+        return sorted(i for i in candidates if query in keys[i])
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _grams(key, n):
+    """
+    Returns the set of the 1 to n character grams of the key.
+    """
+
+    grams = set()
+
+    for m in range(1, n + 1):
+        grams.update(key[i:i + m] for i in range(len(key) - m + 1))
+
+    return grams
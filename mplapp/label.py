@@ -6,6 +6,9 @@ class Label(Base):
     A text label.
     """
 
+    _setters = ('text',)
+
+
     def __init__(self, width, height, text, **kwargs):
 
         self._str = text
@@ -49,7 +52,7 @@ class Label(Base):
                 self._str = new_text
             else:
                 self._text.set_text(new_text)
-                self.canvas().draw()
+                self._redraw()
 
 
     def _render(self, fig, x, y):
@@ -150,5 +153,7 @@ class Label(Base):
 
         self._axes = ax
 
+        self._animate(self._text)
+
 
 
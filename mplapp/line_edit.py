@@ -2,14 +2,14 @@ import sys
 
 import enum
 
-import numpy as np
-
 from matplotlib.patches import Rectangle
 
 import pyperclip
 
 
 from mplapp.label import Label
+from mplapp.text_metrics import CaretTable
+from mplapp.text_metrics import TextMeasure
 
 
 #------------------------------------------------------------------------------
@@ -32,8 +32,15 @@ class Count(object):
 class LineEdit(Label):
     """
     A text label.
+
+    With viewport = True, only the slice of the text that fits in the widget is
+    laid out and drawn, and the view scrolls horizontally to keep the cursor
+    visible, so long text costs the same as short text.  The viewport
+    requires left aligned, single line, plain text.
     """
 
+    _focusable = True
+
     def __init__(self, width, height, text, notify = None, **kwargs):
 
         self._str = text
@@ -52,6 +59,7 @@ class LineEdit(Label):
         ha = 'left'
         pad_left = 0.07 # inches
         highlight = [0.5859, 0.6406, 1.0]
+        viewport = False
 
         if 'ec' not in kwargs and 'edgecolor' not in kwargs:
             kwargs['ec'] = ec
@@ -77,12 +85,17 @@ class LineEdit(Label):
             highlight = kwargs['highlight']
             del kwargs['highlight']
 
+        if 'viewport' in kwargs:
+            viewport = kwargs['viewport']
+            del kwargs['viewport']
+
         self._hl_color = highlight
         self._hl_x0 = None
 
         self._kwargs = kwargs
 
         self._pad_left = pad_left
+        self._pad_right = 0.0 # inches
 
         if notify and not callable(notify):
             raise ValueError('notify must be a callable function')
@@ -96,9 +109,30 @@ class LineEdit(Label):
         self._cursor_idx = None
         self._highlight = None
 
+        # the selection is the range between the anchor and the cursor
+
+        self._sel_anchor = None
+
+        # caret positions, kept for the current version of the text
+
+        self._text_version = 0
+        self._carets = None
+
+        # viewport, the text artist shows self._buffer[view0:view1 + 1]
+
+        self._viewport = viewport
+        self._buffer = text
+        self._view0 = 0
+        self._view1 = 0
+
 
     def _render(self, fig, x, y):
 
+        # the viewport lays out only the visible slice
+
+        if self._viewport:
+            self._str = ''
+
         super(LineEdit, self)._render(fig, x, y)
 
         pos = list(self._text.get_position())
@@ -107,20 +141,190 @@ class LineEdit(Label):
 
         self._text.set_position(pos)
 
-        self.canvas().mpl_connect(
-            'button_press_event', self._on_mouse_down)
+        self._carets = CaretTable(self._text)
+
+        if self._viewport:
+            self._text.set_clip_box(self._axes.bbox)
+            self._text.set_clip_on(True)
+            self._update_view()
+
+        self._connect('button_press_event', self._on_mouse_down)
+
+        self._connect('button_release_event', self._on_mouse_up)
+
+        self._connect('motion_notify_event', self._on_mouse_motion)
+
+        self._connect('key_press_event', self._on_key_press)
+
+        self._connect('key_release_event', self._on_key_release)
+
+
+    def text(self, new_text = None):
+
+        if self._viewport:
+
+            if new_text is None:
+                return self._buffer
+
+            self._buffer = new_text
+            self._view0 = 0
+
+            if self._text is None:
+                self._str = new_text
+
+            else:
+                self._update_view()
+
+            return
+
+        if new_text is not None:
+            self._text_version += 1
+
+        return super(LineEdit, self).text(new_text)
+
+
+    def _edit(self, i0, i1, new_text):
+        """
+        Replaces the characters [i0, i1) with new_text, only the caret
+        positions after i0 are recomputed.
+        """
+
+        s = self.text()
+
+        s = s[0:i0] + new_text + s[i1:]
+
+        if self._viewport:
+            self._buffer = s
+            self._view0 = min(self._view0, len(s))
+            self._update_view()
+            return
+
+        self.text(s)
+
+        self._carets.edit(i0, i1, len(new_text), self._text_version)
+
+
+    def _text_width(self):
+        """
+        Returns the width in pixels available to the text.
+        """
+
+        x0 = self._text.get_transform().transform(self._text.get_position())[0]
+
+        x1 = self._axes.transData.transform((self._width - self._pad_right, 0))
+
+        return x1[0] - x0
+
+
+    def _update_view(self):
+        """
+        Shows the slice of the buffer that fits in the widget, starting at
+        self._view0.
+        """
+
+        s = self._buffer
+
+        m = TextMeasure(self._text)
+
+        self._view1 = m.fit_forward(s, self._view0, self._text_width())
+
+        # plus the partially visible character, clipped by the axes
+
+        end = min(self._view1 + 1, len(s))
+
+        self._text_version += 1
+
+        super(LineEdit, self).text(s[self._view0:end])
+
+
+    def _scroll_to(self, idx):
+        """
+        Scrolls the view so the caret index is visible, returns True if the
+        view moved.
+        """
+
+        if self._view0 <= idx <= self._view1:
+            return False
+
+        if idx < self._view0:
+            self._view0 = idx
+
+        else:
+            m = TextMeasure(self._text)
+            self._view0 = m.fit_backward(self._buffer, idx, self._text_width())
+
+        self._update_view()
+
+        return True
+
+
+    def _char_positions(self):
+        """
+        Returns the pixel x position of each caret index for the current text.
+        """
+
+        if self._carets.version() != self._text_version:
+            self._carets.rebuild(self._text_version)
+
+        return self._carets.positions()
+
+
+    def _search_text(self, x, units):
+        """
+        Returns the caret index and its x position in data units, for a pixel
+        x position or a caret index.
+        """
+
+        char_pos = self._char_positions()
+
+        offset = self._view0 if self._viewport else 0
+
+        if units == 'pixel':
+            x_idx = offset + self._carets.index_at(float(x))
+
+        elif units == 'index':
+            x_idx = x
+
+        else:
+            raise ValueError('unknown unit %s' % repr(units))
+
+        if self._viewport:
+
+            # carets outside of the view are clamped to its edges
+
+            local = min(max(x_idx - offset, 0), len(char_pos) - 1)
+
+        else:
+
+            assert x_idx >= 0
+            assert x_idx < len(char_pos)
+
+            local = x_idx
+
+        x_pixel = char_pos[local]
+
+        # now convert pixels to data units
 
-        self.canvas().mpl_connect(
-            'button_release_event', self._on_mouse_up)
+        pixel_to_data_transform = self._axes.transData.inverted()
 
-        self.canvas().mpl_connect(
-            'motion_notify_event', self._on_mouse_motion)
+        xdata = pixel_to_data_transform.transform((x_pixel, 0))[0]
 
-        self.canvas().mpl_connect(
-            'key_press_event', self._on_key_press)
+        return x_idx, xdata
 
-        self.canvas().mpl_connect(
-            'key_release_event', self._on_key_release)
+
+    def _focus_in(self, reason):
+
+        # a click places the cursor through the mouse handlers, keyboard
+        # traversal selects all the text
+
+        if reason == 'tab' and self._state == State.IDLE:
+            self._change_state(State.SELECTED)
+
+
+    def _focus_out(self):
+
+        if self._state != State.IDLE:
+            self._change_state(State.IDLE)
 
 
     def _render_cursor(self, x, units):
@@ -131,15 +335,20 @@ class LineEdit(Label):
         # render subtext elements to find nearest charactor position for
         # the cursor
 
-        text_idx, xdata = _search_text(self._text, x, units)
+        text_idx, xdata = self._search_text(x, units)
 
         self._cursor_idx = text_idx
 
+        if self._viewport and self._scroll_to(text_idx):
+            _, xdata = self._search_text(text_idx, 'index')
+            self._update_highlight()
+
         # first time rending cursor?
 
         if self._cursor is None:
             color = self._text.get_color()
             self._cursor = self._axes.axvline(xdata, 0.1, 0.9, color = color)
+            self._animate(self._cursor)
 
         else:
             self._cursor.set_data([[xdata, xdata], [0.1, 0.9]])
@@ -152,6 +361,21 @@ class LineEdit(Label):
             self._highlight.set_width(width)
 
 
+    def _update_highlight(self):
+        """
+        Places the highlight between the selection anchor and the cursor.
+        """
+
+        if self._highlight is None or self._sel_anchor is None:
+            return
+
+        _, self._hl_x0 = self._search_text(self._sel_anchor, 'index')
+        _, x1 = self._search_text(self._cursor_idx, 'index')
+
+        self._highlight.set_x(self._hl_x0)
+        self._highlight.set_width(x1 - self._hl_x0)
+
+
     def _change_state(self, new_state, **kwargs):
 
         if self._state == new_state:
@@ -265,7 +489,7 @@ class LineEdit(Label):
 
         self._state = new_state
 
-        self.canvas().draw()
+        self._redraw()
 
 
     def _unhandled_state_transition(self, new_state):
@@ -279,21 +503,22 @@ class LineEdit(Label):
         )
 
 
-    def _replace_selection(self, new_text):
+    def _selection_or_cursor(self):
+        """
+        Returns the selected range, or an empty range at the cursor.
+        """
 
-        if self._highlight.get_visible():
+        if self._highlight and self._highlight.get_visible():
+            return self._get_selected_range()
 
-            i0, i1 = self._get_selected_range()
+        return self._cursor_idx, self._cursor_idx
 
-        else:
-            i0 = self._cursor_idx
-            i1 = i0
 
-        s = self.text()
+    def _replace_selection(self, new_text):
 
-        s = s[0:i0] + new_text + s[i1:]
+        i0, i1 = self._selection_or_cursor()
 
-        self.text(s)
+        self._edit(i0, i1, new_text)
 
         self._render_cursor(i0 + len(new_text), 'index')
 
@@ -304,10 +529,10 @@ class LineEdit(Label):
 
         if self._cursor:
             self._cursor.set_visible(False)
-            self.canvas().draw()
+            self._redraw()
 
         if self._notify and key == 'enter':
-            self._notify(self.text())
+            self._invoke(self._notify, self.text())
 
 #~            # restore default keymap
 
@@ -321,19 +546,22 @@ class LineEdit(Label):
 
         if x_pixel:
 
-            txt_idx, x = _search_text(self._text, x_pixel, 'pixel')
+            txt_idx, x = self._search_text(x_pixel, 'pixel')
 
             self._hl_x0 = x
+            self._sel_anchor = txt_idx
 
             if self._cursor_idx is None:
                 self._render_cursor(x_pixel, 'pixel')
 
         elif x0:
-            self._hl_x0 = x0
+            x_pixel = self._axes.transData.transform((x0, 0))[0]
+            self._sel_anchor, self._hl_x0 = self._search_text(x_pixel, 'pixel')
 
         else:
             x = self._cursor.get_data()[0]
             self._hl_x0 = x[0]
+            self._sel_anchor = self._cursor_idx
 
         if self._highlight is None:
 
@@ -345,13 +573,15 @@ class LineEdit(Label):
 
             self._axes.add_patch(r)
 
+            self._animate(r)
+
         else:
 
             self._highlight.set_x(self._hl_x0)
             self._highlight.set_width(width)
             self._highlight.set_visible(True)
 
-        self.canvas().draw()
+        self._redraw()
 
 
     def _stop_selecting(self):
@@ -364,10 +594,11 @@ class LineEdit(Label):
 
         n_chars = len(self.text())
 
-        _, x0 = _search_text(self._text, 0, 'index')
-        _, x1 = _search_text(self._text, n_chars, 'index')
+        _, x0 = self._search_text(0, 'index')
+        _, x1 = self._search_text(n_chars, 'index')
 
         self._hl_x0 = x0
+        self._sel_anchor = 0
         width = x1 - x0
 
         if self._highlight is None:
@@ -380,6 +611,8 @@ class LineEdit(Label):
 
             self._axes.add_patch(r)
 
+            self._animate(r)
+
         else:
 
             self._highlight.set_x(self._hl_x0)
@@ -437,9 +670,10 @@ class LineEdit(Label):
         if self._state != State.SELECTING:
             return
 
-        width = x - self._hl_x0
-        self._highlight.set_width(width)
-        self.canvas().draw()
+        # the cursor follows the pointer, it ends the selection
+
+        self._render_cursor(event.x, 'pixel')
+        self._redraw()
 
 
     def _on_key_press(self, event):
@@ -473,7 +707,7 @@ class LineEdit(Label):
                     self._change_state(State.TYPING)
 
                 else:
-                    self.canvas().draw()
+                    self._redraw()
 
             if self._state != State.TYPING:
                 self._change_state(State.TYPING)
@@ -483,16 +717,11 @@ class LineEdit(Label):
             if self._cursor_idx == 0:
                 return
 
-            text_idx, xdata = _search_text(
-                self._text, self._cursor_idx, 'index')
-
-            s = self.text()
-
-            s = s[0:text_idx-1] + s[text_idx:]
+            idx = self._cursor_idx
 
-            self.text(s)
+            self._edit(idx - 1, idx, '')
 
-            self._render_cursor(self._cursor_idx - 1, 'index')
+            self._render_cursor(idx - 1, 'index')
 
         elif key == 'delete':
             self._do_delete()
@@ -509,7 +738,7 @@ class LineEdit(Label):
                 self._change_state(State.TYPING)
 
             else:
-                self.canvas().draw()
+                self._redraw()
 
         elif key == 'right':
 
@@ -524,7 +753,7 @@ class LineEdit(Label):
                 self._change_state(State.TYPING)
 
             else:
-                self.canvas().draw()
+                self._redraw()
 
         elif key == 'home':
 
@@ -537,7 +766,7 @@ class LineEdit(Label):
             self._cursor_idx = 0
 
             self._render_cursor(self._cursor_idx, 'index')
-            self.canvas().draw()
+            self._redraw()
 
         elif key == 'end':
 
@@ -552,7 +781,7 @@ class LineEdit(Label):
             self._cursor_idx = N
 
             self._render_cursor(self._cursor_idx, 'index')
-            self.canvas().draw()
+            self._redraw()
 
         elif key == 'enter':
             self._stop_typing(key)
@@ -568,12 +797,7 @@ class LineEdit(Label):
 
         elif key in ['ctrl+c', 'ctrl+x']:
 
-            start, end = self._highlight.get_window_extent().get_points()
-
-            x0, x1 = start[0], end[0]
-
-            i0, _ = _search_text(self._text, x0, 'pixel')
-            i1, _ = _search_text(self._text, x1, 'pixel')
+            i0, i1 = self._selection_or_cursor()
 
             delta = i1 - i0
 
@@ -592,17 +816,7 @@ class LineEdit(Label):
 
             temp = pyperclip.paste()
 
-            i0, i1 = self._get_selected_range()
-
-            s = str(self.text())
-
-            s = s[0:i0] + temp + s[i1:]
-
-            self.text(s)
-
-            self._cursor_idx = i0 + len(temp)
-
-            self._render_cursor(self._cursor_idx, 'index')
+            self._replace_selection(temp)
 
             self._stop_selecting()
 
@@ -642,12 +856,11 @@ class LineEdit(Label):
 
         assert self._highlight.get_visible()
 
-        start, end = self._highlight.get_window_extent().get_points()
+        i0 = self._sel_anchor
+        i1 = self._cursor_idx
 
-        x0, x1 = start[0], end[0]
-
-        i0, _ = _search_text(self._text, x0, 'pixel')
-        i1, _ = _search_text(self._text, x1, 'pixel')
+        if i0 > i1:
+            i0, i1 = i1, i0
 
         return i0, i1
 
@@ -659,137 +872,19 @@ class LineEdit(Label):
 
         N = len(self.text())
 
-        s = self.text()
-
-        i0, i1 = self._get_selected_range()
+        i0, i1 = self._selection_or_cursor()
 
         if self._cursor_idx > i0:
             self._cursor_idx = i0
 
-        if i1 > i0:
-            s = s[0:i0] + s[i1:]
+        if i0 == i1:
+            i1 = min(i0 + 1, N)
 
-        elif i0 == i1:
-            s = s[0:i0] + s[i0+1:]
-
-        else:
-            s = s[0:i0] + s[i1:]
-
-        self.text(s)
+        self._edit(i0, i1, '')
 
         self._render_cursor(self._cursor_idx, 'index')
 
 
-#------------------------------------------------------------------------------
-# render text element and inspect the bounding box
-
-def _search_text(text, x, units):
-
-#~    dout("_search_text(x=%f, units=%s)", x, units)
-
-    char_pos = np.array(_get_text_positions(text))
-
-    if units == 'pixel':
-
-#~        dout("    subtracting float from np.array")
-
-        dist = np.abs(char_pos - float(x))
-
-        x_idx = np.round(dist).argmin()
-
-    elif units == 'index':
-        x_idx = x
-
-#~        dout("    len(char_pos) = %d", len(char_pos))
-#~        dout("    x_idx = %d", x_idx)
-
-    else:
-        raise ValueError('unknown unit %s' % repr(units))
-
-    assert x_idx >= 0
-    assert x_idx <= len(char_pos)
-
-#~    dout("    indexing into np.array")
-
-    x_pixel = char_pos[x_idx]
-
-#~    dout("    x_pixel = %f", x_pixel)
-
-    # now convert pixels to data units
-
-    pixel_to_data_transform = text.axes.transData.inverted()
-
-    xdata = pixel_to_data_transform.transform((x_pixel, 0))[0]
-
-#~    dout("    returning xdata=%f", xdata)
-
-    return x_idx, xdata
-
-
-def _get_text_positions(text):
-    '''
-    For each character in the text object, return a list pixel values for
-    the start of each character.
-
-    Note, this returns a list that is len(text) + 1, so that the end of the
-    last character can be determined.
-    '''
-
-    orig = text.get_text()
-
-    #--------------------------------------------------------------------------
-    # the backend render ignores leading trailing whitespace, so lets directly
-    # measure the width of a space
-
-    text.set_text('##')
-
-    bb = text.get_window_extent()
-
-    width0 = bb.width
-
-    text.set_text('# #')
-
-    bb = text.get_window_extent()
-
-    width1 = bb.width
-
-    space_width = width1 - width0
-
-    #--------------------------------------------------------------------------
-    # measure the position of each character
-
-    s = str(orig)
-
-    N = len(s)
-
-    x_positions = [bb.x0]
-
-    for i in range(1, N + 1):
-
-        txt = s[0:i]
-
-        text.set_text(txt)
-
-        bb = text.get_window_extent()
-
-        x = bb.x0 + bb.width
-
-        # adjust for spaces
-        if txt[0] == ' ':
-            x += space_width
-
-        if i > 0 and txt[-1] == ' ':
-            x += space_width
-
-        x_positions.append(x)
-
-    # restore text
-
-    text.set_text(orig)
-
-    return x_positions
-
-
 #------------------------------------------------------------------------------
 # Support classes / functions
 
@@ -0,0 +1,518 @@
+"""
+Precomputed parameter spaces for apps with a few sliders feeding a pure
+function.
+
+A LookupTable evaluates func over a grid of slider values ahead of time,
+in chunks on a process pool, into a memory-mapped array.  Looking up values
+interpolates the grid multilinearly, a few array reads whatever func costs,
+so dragging stays smooth however slow func is.
+
+While the sliders are idle, the grid cell around the last values and its
+neighbours are refined, func is evaluated on a finer grid over each cell
+and lookups inside refined cells interpolate that instead.
+
+    table = LookupTable(
+        functools.partial(gaussian, t),
+        [np.linspace(-5, 5, 101), np.linspace(0.1, 5, 50)],
+        vectorized = True,
+        widget = plot,
+    )
+
+    table.build(plot)
+
+The table may be persisted to a path, the key then identifies func, e.g. a
+version string bumped whenever func changes, it is stored with the table
+and the table is only reused when it matches, along with the grid and the
+arguments of a partial func.
+
+    y = table(mu, sigma)
+"""
+
+import functools
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+
+from mplapp.background import process_pool
+from mplapp.lru import LRUCache
+
+
+class LookupTable(object):
+    """
+    func(*values) over the grid axes, one ascending array of values per
+    parameter.  func returns a number or an array of a fixed shape, with
+    vectorized = True it is called with one array of values per parameter
+    and returns the results stacked along a first axis.
+
+    The executor, a shared process pool by default, needs func to be
+    picklable, e.g. a module level function or a partial of one.
+
+    The table is stored in path, reused when it holds a complete table of
+    the same key, partial arguments and grid, or in an anonymous temporary
+    file.  A path needs a key, as func's code isn't compared.  Refinement
+    needs a
+    widget, cells are split refine times along each axis, the refined cells
+    are kept in an LRUCache of max_refined_bytes.
+    """
+
+    CHUNK = 64 # grid points per job
+    REFINE = 4
+    IDLE = 0.25 # seconds
+    MAX_REFINED_BYTES = 64 * 2 ** 20
+
+
+    def __init__(
+            self,
+            func,
+            axes,
+            path = None,
+            key = None,
+            vectorized = False,
+            executor = None,
+            widget = None,
+            refine = REFINE,
+            idle = IDLE,
+            max_refined_bytes = MAX_REFINED_BYTES,
+        ):
+
+        if not callable(func):
+            raise ValueError("func isn't callable!")
+
+        if path is not None and key is None:
+            raise ValueError('a persisted table needs a key identifying func')
+
+        axes = [np.asarray(a, dtype = float) for a in axes]
+
+        for a in axes:
+            if a.ndim != 1 or len(a) < 2 or np.any(np.diff(a) <= 0):
+                raise ValueError('axes must be ascending arrays of 2+ values')
+
+        self._func = func
+        self._axes = axes
+        self._path = path
+        self._key = key
+        self._vectorized = vectorized
+        self._executor = executor
+        self._widget = widget
+        self._refine = refine if widget is not None else 0
+        self._idle = idle
+
+        self._shape = tuple(len(a) for a in axes)
+
+        # the output shape, from the first grid point
+
+        first = _evaluate(func, np.array([[a[0] for a in axes]]), vectorized)
+
+        self._out_shape = first.shape[1:]
+
+        self._table, complete = self._open_table()
+
+        self._flat = self._table.reshape((-1,) + self._out_shape)
+
+        self._ready = np.zeros(self._shape, dtype = bool)
+
+        if complete:
+            self._ready[...] = True
+
+        self._refined = LRUCache(
+            max_refined_bytes, sizeof = lambda a: a.nbytes)
+
+        self._timer = None
+        self._last = None     # cell of the latest lookup
+        self._queue = []      # cells to refine, nearest first
+        self._running = None  # cell being refined
+
+        # statistics
+
+        self._n_lookups = 0
+        self._n_refined_lookups = 0
+        self._n_exact = 0
+        self._n_refine_errors = 0
+        self._lookup_time = 0.0
+
+
+    def __call__(self, *values):
+        """
+        Returns func(*values) interpolated from the table, or computed when
+        the table isn't built around the values yet.
+        """
+
+        t0 = time.time()
+
+        cell, frac = self._locate(values)
+
+        patch = self._refined.get(cell) if self._refine else None
+
+        if patch is not None:
+
+            # position in the refined cell
+
+            local = frac * self._refine
+            sub = np.minimum(np.floor(local).astype(int), self._refine - 1)
+
+            result = _interpolate(patch, sub, local - sub)
+
+            self._n_refined_lookups += 1
+
+        elif self._ready[tuple(slice(i, i + 2) for i in cell)].all():
+            result = _interpolate(self._table, np.array(cell), frac)
+
+        else:
+            result = self._func(*values)
+            self._n_exact += 1
+
+        self._n_lookups += 1
+        self._lookup_time += time.time() - t0
+
+        self._last = cell
+
+        if self._refine:
+            self._restart_idle()
+
+        return result
+
+
+    def axes(self):
+        return self._axes
+
+
+    def ready(self):
+        """
+        Returns the fraction of the grid computed.
+        """
+        return self._ready.mean()
+
+
+    def build(self, widget = None):
+        """
+        Computes the grid, blocking, or in the background with the results
+        delivered to the GUI thread of the widget's Window.  Lookups compute
+        func directly where the grid isn't ready.
+        """
+
+        if self._ready.all():
+            return
+
+        executor = self._executor or process_pool()
+
+        todo = np.flatnonzero(~self._ready.ravel())
+
+        chunks = [
+            todo[i:i + self.CHUNK] for i in range(0, len(todo), self.CHUNK)
+        ]
+
+        jobs = [
+            (self._func, self._points(chunk), self._vectorized)
+            for chunk in chunks
+        ]
+
+        if widget is None:
+
+            results = executor.map(_evaluate, *zip(*jobs))
+
+            for chunk, result in zip(chunks, results):
+                self._fill(chunk, result)
+
+            return
+
+        window = widget._window()
+
+        if window is None:
+            raise RuntimeError('the widget must be rendered in a Window')
+
+        for chunk, job in zip(chunks, jobs):
+
+            future = executor.submit(_evaluate, *job)
+
+            # wrapped so deliveries never collapse in the call_soon() queue
+
+            future.add_done_callback(
+                lambda f, chunk = chunk: window.call_soon(
+                    functools.partial(self._deliver_chunk, chunk, f)))
+
+
+    def stats(self):
+        """
+        Returns a dict with the number of lookups, those from refined cells
+        and those computed directly, the mean lookup time in seconds, the
+        fraction of the grid ready, the number of refinements that raised
+        and the refined cells cache statistics.
+        """
+
+        return dict(
+            lookups = self._n_lookups,
+            refined_lookups = self._n_refined_lookups,
+            exact = self._n_exact,
+            mean_lookup = self._lookup_time / max(self._n_lookups, 1),
+            ready = self.ready(),
+            refine_errors = self._n_refine_errors,
+            refined = self._refined.stats(),
+        )
+
+
+    def _open_table(self):
+        """
+        Returns the table memmap and whether it is complete.
+        """
+
+        shape = self._shape + self._out_shape
+
+        if self._path is None:
+            table = np.memmap(
+                tempfile.TemporaryFile(), dtype = float, mode = 'w+',
+                shape = shape)
+            return table, False
+
+        meta = self._meta()
+
+        try:
+            with open(self._path + '.json') as fd:
+                if json.load(fd) == meta:
+                    return np.load(self._path, mmap_mode = 'r'), True
+
+        except (IOError, OSError, ValueError):
+            pass
+
+        if os.path.exists(self._path + '.json'):
+            os.remove(self._path + '.json')
+
+        table = open_memmap(
+            self._path, mode = 'w+', dtype = float, shape = shape)
+
+        return table, False
+
+
+    def _meta(self):
+
+        func = getattr(self._func, 'func', self._func)
+
+        return dict(
+            key = self._key,
+            func = getattr(func, '__name__', ''),
+            partial = _partial_digest(self._func),
+            axes = [a.tolist() for a in self._axes],
+            shape = list(self._out_shape),
+        )
+
+
+    def _points(self, flat_index):
+        """
+        Returns the values of grid points, one row per point.
+        """
+
+        index = np.unravel_index(flat_index, self._shape)
+
+        return np.column_stack([a[i] for a, i in zip(self._axes, index)])
+
+
+    def _fill(self, flat_index, result):
+
+        self._flat[flat_index] = result
+
+        self._ready.ravel()[flat_index] = True
+
+        if self._ready.all():
+
+            self._table.flush()
+
+            if self._path is not None:
+                with open(self._path + '.json', 'w') as fd:
+                    json.dump(self._meta(), fd)
+
+
+    def _deliver_chunk(self, chunk, future):
+        """
+        Called on the GUI thread with a finished build job.
+        """
+
+        self._fill(chunk, future.result())
+
+
+    def _locate(self, values):
+        """
+        Returns the grid cell of the values, and their fractional position
+        in it along each axis.
+        """
+
+        cell = []
+        frac = []
+
+        for a, v in zip(self._axes, values):
+
+            i = np.searchsorted(a, v, side = 'right') - 1
+            i = int(np.clip(i, 0, len(a) - 2))
+
+            cell.append(i)
+            frac.append(np.clip((v - a[i]) / (a[i + 1] - a[i]), 0.0, 1.0))
+
+        return tuple(cell), np.array(frac)
+
+
+    #--------------------------------------------------------------------------
+    # refinement
+
+    def _restart_idle(self):
+
+        self._queue = []
+
+        if self._timer is None:
+
+            self._timer = self._widget.canvas().new_timer(
+                interval = int(1000 * self._idle))
+
+            self._timer.single_shot = True
+            self._timer.add_callback(self._on_idle)
+
+        self._timer.stop()
+        self._timer.start()
+
+
+    def _on_idle(self):
+
+        # the last cell, then its neighbours
+
+        cells = [self._last]
+
+        for offset in itertools.product([-1, 0, 1], repeat = len(self._shape)):
+
+            cell = tuple(c + o for c, o in zip(self._last, offset))
+
+            if cell != self._last and all(
+                    0 <= c < n - 1 for c, n in zip(cell, self._shape)):
+                cells.append(cell)
+
+        self._queue = [c for c in cells if c not in self._refined]
+
+        if self._running is None:
+            self._refine_next()
+
+
+    def _refine_next(self):
+
+        if not self._queue:
+            return
+
+        window = self._widget._window()
+
+        if window is None:
+            return
+
+        cell = self._queue.pop(0)
+
+        r = self._refine
+
+        grids = [
+            np.linspace(a[i], a[i + 1], r + 1)
+            for a, i in zip(self._axes, cell)
+        ]
+
+        points = np.column_stack(
+            [g.ravel() for g in np.meshgrid(*grids, indexing = 'ij')])
+
+        executor = self._executor or process_pool()
+
+        future = executor.submit(
+            _evaluate, self._func, points, self._vectorized)
+
+        self._running = cell
+
+        future.add_done_callback(
+            lambda f: window.call_soon(
+                functools.partial(self._deliver_refined, cell, f)))
+
+
+    def _deliver_refined(self, cell, future):
+        """
+        Called on the GUI thread with a finished refinement.
+        """
+
+        self._running = None
+
+        error = future.exception()
+
+        if error is None:
+
+            shape = (self._refine + 1,) * len(cell) + self._out_shape
+
+            self._refined.put(cell, future.result().reshape(shape))
+
+        else:
+            self._n_refine_errors += 1
+
+        # the queue is emptied when the table is looked up again
+
+        self._refine_next()
+
+        # raised on the GUI thread, the call_soon() queue prints it, the
+        # cell is tried again when the sliders are next idle on it
+
+        if error is not None:
+            raise error
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _evaluate(func, points, vectorized):
+    """
+    Returns func at the points, one row of values per point, stacked, runs
+    on the executor.
+    """
+
+    if vectorized:
+        return np.asarray(func(*points.T), dtype = float)
+
+    return np.array([func(*p) for p in points], dtype = float)
+
+
+def _partial_digest(func):
+    """
+    Returns a digest of the arguments bound by functools.partial, '' for
+    other callables.
+    """
+
+    if not isinstance(func, functools.partial):
+        return ''
+
+    digest = hashlib.sha1()
+
+    values = list(func.args) + sorted((func.keywords or {}).items())
+
+    for value in values:
+
+        if isinstance(value, np.ndarray):
+            digest.update(str((value.dtype, value.shape)).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+
+        else:
+            digest.update(repr(value).encode())
+
+    return digest.hexdigest()
+
+
+def _interpolate(table, index, frac):
+    """
+    Multilinear interpolation of the table in the cell at index, at the
+    fractional position frac.
+    """
+
+    result = 0.0
+
+    for corner in itertools.product([0, 1], repeat = len(index)):
+
+        corner = np.array(corner)
+
+        weight = np.prod(np.where(corner, frac, 1.0 - frac))
+
+        if weight:
+            result = result + weight * table[tuple(index + corner)]
+
+    return result
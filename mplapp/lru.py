@@ -0,0 +1,132 @@
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A mapping that evicts its least recently used entries once the total
+    size of its values exceeds the capacity.
+
+    sizeof(value) gives the size of a value, 1 by default, so the capacity
+    is a number of entries, pass sizeof = lambda a: a.nbytes to bound the
+    memory of cached arrays instead.
+    """
+
+    def __init__(self, capacity, sizeof = None):
+
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+
+        self._capacity = capacity
+        self._sizeof = sizeof or (lambda value: 1)
+
+        self._entries = OrderedDict() # key -> (value, size), least recent first
+        self._size = 0
+
+        # statistics
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+    def capacity(self):
+        return self._capacity
+
+
+    def size(self):
+        return self._size
+
+
+    def get(self, key, default = None):
+        """
+        Returns the value for key and marks it as the most recently used, or
+        default.
+        """
+
+        entry = self._entries.pop(key, None)
+
+        if entry is None:
+            self._misses += 1
+            return default
+
+        self._hits += 1
+
+        self._entries[key] = entry
+
+        return entry[0]
+
+
+    def put(self, key, value):
+        """
+        Stores the value as the most recently used, returns the list of
+        evicted keys.  A value larger than the capacity isn't stored.
+        """
+
+        self.pop(key)
+
+        size = self._sizeof(value)
+
+        if size > self._capacity:
+            return []
+
+        self._entries[key] = (value, size)
+        self._size += size
+
+        return self._evict()
+
+
+    def pop(self, key, default = None):
+
+        entry = self._entries.pop(key, None)
+
+        if entry is None:
+            return default
+
+        self._size -= entry[1]
+
+        return entry[0]
+
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+
+    def stats(self):
+        """
+        Returns a dict with the number of hits, misses and evictions, the
+        number of entries and their total size.
+        """
+
+        return dict(
+            hits = self._hits,
+            misses = self._misses,
+            evictions = self._evictions,
+            entries = len(self._entries),
+            size = self._size,
+            capacity = self._capacity,
+        )
+
+
+    def _evict(self):
+
+        evicted = []
+
+        while self._size > self._capacity:
+
+            key, (value, size) = self._entries.popitem(last = False)
+
+            self._size -= size
+            self._evictions += 1
+
+            evicted.append(key)
+
+        return evicted
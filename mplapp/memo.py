@@ -0,0 +1,310 @@
+"""
+Memoization of app callbacks on quantized widget values.
+
+Dragging a Slider back and forth asks for the same results over and over.
+A Memo keys the results of func(*values) on the values snapped to a grid of
+resolution, keeps them in a memory bounded LRUCache, and func is called
+with the snapped values so a cached result is exactly the one computed.
+
+    curve = Memo(functools.partial(gaussian, t), resolution = 0.01)
+
+    y = curve(mu, sigma)
+
+With prefetch = n and a widget, once the Memo hasn't been called for idle
+seconds, the results n steps around the last values are computed one at a
+time on a background executor, and stop as soon as it is called again.
+"""
+
+import functools
+import sys
+import weakref
+
+
+import numpy as np
+
+
+from mplapp.background import thread_pool
+from mplapp.lru import LRUCache
+
+
+_MISSING = object()
+
+_memos = weakref.WeakSet()
+
+
+class Memo(object):
+    """
+    Caches func(*values), keyed on the values quantized to resolution, a
+    number for all the values or a sequence with one per value, None for
+    hashable values that are used as they are.
+
+    max_bytes bounds the memory of the results, sizeof(result) gives their
+    size, the nbytes of arrays by default.  limits, a (low, high) pair or
+    None per value, bounds the prefetched values.  Call it from the GUI
+    thread, func must be thread safe when prefetching.
+    """
+
+    MAX_BYTES = 64 * 2 ** 20
+    IDLE = 0.25 # seconds
+
+
+    def __init__(
+            self,
+            func,
+            resolution = None,
+            max_bytes = MAX_BYTES,
+            sizeof = None,
+            prefetch = 0,
+            limits = None,
+            widget = None,
+            executor = None,
+            idle = IDLE,
+            name = None,
+        ):
+
+        if not callable(func):
+            raise ValueError("func isn't callable!")
+
+        if prefetch and widget is None:
+            raise ValueError('prefetch needs a widget to find its Window')
+
+        self._func = func
+        self._resolution = resolution
+        self._cache = LRUCache(max_bytes, sizeof = sizeof or _nbytes)
+        self._prefetch = prefetch
+        self._limits = limits
+        self._widget = widget
+        self._executor = executor
+        self._idle = idle
+        self._name = name or _name(func)
+
+        self._last = None     # key of the latest call
+        self._timer = None    # fires once idle
+        self._queue = []      # keys to prefetch, nearest first
+        self._running = None  # key being prefetched
+
+        self._prefetched = set() # prefetched keys not used yet
+
+        # statistics
+
+        self._n_prefetched = 0
+        self._n_prefetch_hits = 0
+
+        _memos.add(self)
+
+
+    def __call__(self, *values):
+
+        key = self.key(*values)
+
+        result = self._cache.get(key, _MISSING)
+
+        if result is _MISSING:
+            result = self._func(*self._values(key))
+            self._store(key, result)
+
+        elif key in self._prefetched:
+            self._prefetched.discard(key)
+            self._n_prefetch_hits += 1
+
+        self._last = key
+
+        if self._prefetch:
+            self._restart_idle()
+
+        return result
+
+
+    def name(self):
+        return self._name
+
+
+    def key(self, *values):
+        """
+        Returns the cache key of the values.
+        """
+
+        return tuple(
+            v if r is None else int(round(v / r))
+            for v, r in zip(values, self._resolutions(len(values)))
+        )
+
+
+    def clear(self):
+        self._cache.clear()
+        self._prefetched.clear()
+        self._queue = []
+
+
+    def stats(self):
+        """
+        Returns a dict with the cache statistics, sizes in bytes, the number
+        of results prefetched and of hits on them.
+        """
+
+        stats = self._cache.stats()
+
+        stats.update(
+            name = self._name,
+            prefetched = self._n_prefetched,
+            prefetch_hits = self._n_prefetch_hits,
+        )
+
+        return stats
+
+
+    def _resolutions(self, n):
+
+        r = self._resolution
+
+        if r is None or np.isscalar(r):
+            return [r] * n
+
+        return r
+
+
+    def _values(self, key):
+        """
+        Returns the quantized values of a key.
+        """
+
+        return [
+            k if r is None else k * r
+            for k, r in zip(key, self._resolutions(len(key)))
+        ]
+
+
+    def _store(self, key, result):
+
+        for evicted in self._cache.put(key, result):
+            self._prefetched.discard(evicted)
+
+
+    def _restart_idle(self):
+
+        self._queue = []
+
+        if self._timer is None:
+
+            self._timer = self._widget.canvas().new_timer(
+                interval = int(1000 * self._idle))
+
+            self._timer.single_shot = True
+            self._timer.add_callback(self._on_idle)
+
+        self._timer.stop()
+        self._timer.start()
+
+
+    def _on_idle(self):
+
+        self._queue = self._neighbours(self._last)
+
+        if self._running is None:
+            self._submit_next()
+
+
+    def _neighbours(self, key):
+        """
+        Returns the keys up to prefetch steps away from key along each
+        quantized value, nearest first, that aren't cached.
+        """
+
+        resolutions = self._resolutions(len(key))
+        limits = self._limits or [None] * len(key)
+
+        keys = []
+
+        for step in range(1, self._prefetch + 1):
+
+            for i, (r, lim) in enumerate(zip(resolutions, limits)):
+
+                if r is None:
+                    continue
+
+                for k in [key[i] + step, key[i] - step]:
+
+                    if lim is not None and not lim[0] <= k * r <= lim[1]:
+                        continue
+
+                    neighbour = key[:i] + (k,) + key[i + 1:]
+
+                    if neighbour not in self._cache:
+                        keys.append(neighbour)
+
+        return keys
+
+
+    def _submit_next(self):
+
+        while self._queue:
+
+            key = self._queue.pop(0)
+
+            if key not in self._cache:
+                break
+
+        else:
+            return
+
+        window = self._widget._window()
+
+        if window is None:
+            return
+
+        executor = self._executor or thread_pool()
+
+        future = executor.submit(self._func, *self._values(key))
+
+        self._running = key
+
+        future.add_done_callback(
+            lambda f: window.call_soon(
+                functools.partial(self._deliver, key, f)))
+
+
+    def _deliver(self, key, future):
+        """
+        Called on the GUI thread with a finished prefetch.
+        """
+
+        self._running = None
+
+        if future.exception() is None and key not in self._cache:
+            self._store(key, future.result())
+            self._prefetched.add(key)
+            self._n_prefetched += 1
+
+        # the queue is emptied when the Memo is called again
+
+        self._submit_next()
+
+
+def all_stats():
+    """
+    Returns the stats() of all the live Memos.
+    """
+    return [memo.stats() for memo in list(_memos)]
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _name(func):
+
+    # functools.partial objects have no name
+
+    func = getattr(func, 'func', func)
+
+    return getattr(func, '__name__', 'memo')
+
+
+def _nbytes(value):
+
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+
+    return sys.getsizeof(value)
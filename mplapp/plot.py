@@ -1,17 +1,66 @@
+import numpy as np
+
+
 from mplapp.base import Base
+from mplapp.data_source import MemmapSource
+from mplapp.decimate import MinMaxPyramid
+from mplapp.progressive import Progressive
+from mplapp.ring_buffer import RingBuffer
 
 
 class Plot(Base):
     """
     A wrapper for an Axes.
+
+    With capacity = N, the plot streams a line of the last N points added
+    with append(), kept in preallocated ring buffers.  The line is animated,
+    appends are coalesced into one blit per redraw, and the line data is only
+    updated once per repaint.  With autoscroll = True, when the data passes
+    the right edge, the x-limits jump forward by half of xspan, only these
+    jumps redraw the whole figure.
+
+    series(x, y) plots a large series through a MinMaxPyramid, the line only
+    holds the min/max envelope of each pixel column of the current x-limits,
+    recomputed when they or the axes' size change, so drawing it costs the
+    same for any number of samples.  series(source) plots a MemmapSource,
+    e.g. from open_recording(), only reading the samples in view from its
+    file.  While the axes are dragged, e.g. panned with the toolbar, the
+    envelopes are computed at a coarse resolution, in full once released.
+    A press starts a drag in a toolbar pan or zoom mode, or once the pointer
+    moves DRAG_PIXELS, a plain click doesn't.
     """
 
+    DRAG_PIXELS = 3
+
     def __init__(self, width, height, **kwargs):
 
         self._width = float(width)
         self._height = float(height)
         self._axes = None
 
+        # streaming
+
+        self._capacity = kwargs.get('capacity', None)
+        self._autoscroll = kwargs.get('autoscroll', False)
+        self._xspan = kwargs.get('xspan', None)
+        self._line_kw = kwargs.get('line_kw', {})
+
+        self._line = None
+        self._stale = False
+
+        self._series = [] # [(line, pyramid), ...]
+        self._lod = None # Progressive update of the envelopes
+
+        self._press = None     # pixel position of the button press
+        self._dragging = False
+
+        self._xbuf = None
+        self._ybuf = None
+
+        if self._capacity:
+            self._xbuf = RingBuffer(self._capacity)
+            self._ybuf = RingBuffer(self._capacity)
+
 
     def axes(self):
         if self._axes:
@@ -29,6 +78,215 @@ class Plot(Base):
         return self._width, self._height
 
 
+    def line(self):
+        """
+        Returns the streaming Line2D.
+        """
+        return self._line
+
+
+    def append(self, x, y):
+        """
+        Appends a point, or arrays of points, to the streaming line.
+        """
+
+        if not self._capacity:
+            raise RuntimeError('Plot was not created with a capacity')
+
+        if np.ndim(x):
+            self._xbuf.extend(x)
+            self._ybuf.extend(y)
+
+        else:
+            self._xbuf.append(x)
+            self._ybuf.append(y)
+
+        if self._stale:
+            return
+
+        self._stale = True
+
+        if self._window():
+            self._redraw()
+
+        else:
+            self._prepare_draw()
+            self.canvas().draw_idle()
+
+
+    def series(self, x, y = None, **line_kw):
+        """
+        Plots y(x), x sorted ascending, decimated to the axes' pixel columns,
+        returns the Line2D.  x may instead be a MemmapSource, without y, a
+        memmap y is wrapped in a MemmapSource, its pyramid kept in memory,
+        pass a MemmapSource with persist = True to keep it next to the
+        file.
+        """
+
+        ax = self.axes()
+
+        if y is None:
+            pyramid = x.pyramid()
+
+        elif isinstance(y, np.memmap):
+            pyramid = MemmapSource(y, x).pyramid()
+
+        else:
+            pyramid = MinMaxPyramid(x, y)
+
+        line, = ax.plot([], [], **line_kw)
+
+        self._series.append((line, pyramid))
+
+        if self._lod is None:
+
+            self._lod = Progressive(self._update_series, self)
+
+            ax.callbacks.connect('xlim_changed', self._lod)
+            self.canvas().mpl_connect('resize_event', self._lod)
+
+            self._connect('button_press_event', self._on_mouse_press)
+            self._connect('motion_notify_event', self._on_mouse_motion)
+            self._connect('button_release_event', self._on_mouse_release)
+
+        if len(pyramid):
+            (x0, x1), (y0, y1) = pyramid.x_range(), pyramid.y_range()
+            ax.update_datalim([[x0, y0], [x1, y1]])
+            ax.autoscale_view()
+
+        self._update_series()
+
+        return line
+
+
+    def _update_series(self, budget = 1.0, *args):
+        """
+        Recomputes the envelopes for the current x-limits and pixel width,
+        on budget times as many columns.
+        """
+
+        ax = self._axes
+
+        # align the columns with the pixel columns of the canvas
+
+        px0 = np.floor(ax.bbox.x0)
+        px1 = np.ceil(ax.bbox.x1)
+
+        to_data = ax.transData.inverted()
+
+        x0 = to_data.transform((px0, 0))[0]
+        x1 = to_data.transform((px1, 0))[0]
+
+        n_columns = max(int(budget * (px1 - px0)), 1)
+
+        for line, pyramid in self._series:
+            line.set_data(*pyramid.envelope(x0, x1, n_columns))
+
+        # coalesced with the other repaints, the full pass after a drag runs
+        # from a timer
+
+        self._redraw(full = True)
+
+
+    def _on_mouse_press(self, event):
+
+        if event.inaxes != self._axes:
+            return
+
+        self._press = (event.x, event.y)
+
+        # the toolbar is panning or zooming, otherwise a click only becomes
+        # a drag once the pointer moves
+
+        toolbar = self.canvas().toolbar
+
+        if toolbar is not None and toolbar.mode:
+            self._start_drag()
+
+
+    def _on_mouse_motion(self, event):
+
+        if self._press is None or self._dragging:
+            return
+
+        dx = event.x - self._press[0]
+        dy = event.y - self._press[1]
+
+        if dx * dx + dy * dy > self.DRAG_PIXELS ** 2:
+            self._start_drag()
+
+
+    def _on_mouse_release(self, event):
+
+        self._press = None
+
+        if not self._dragging:
+            return
+
+        self._dragging = False
+
+        self._release()
+
+        self._end_interaction()
+
+
+    def _start_drag(self):
+
+        self._dragging = True
+
+        self._capture()
+
+        self._begin_interaction()
+
+
+    def clear(self):
+        """
+        Removes all the points of the streaming line.
+        """
+
+        if not self._capacity:
+            raise RuntimeError('Plot was not created with a capacity')
+
+        self._xbuf.clear()
+        self._ybuf.clear()
+
+        self._stale = True
+
+        self._redraw()
+
+
+    def _prepare_draw(self):
+
+        if not self._stale:
+            return False
+
+        self._stale = False
+
+        x = self._xbuf.view()
+
+        self._line.set_data(x, self._ybuf.view())
+
+        if not self._autoscroll or len(x) == 0:
+            return False
+
+        x0, x1 = self._axes.get_xlim()
+
+        xlast = x[-1]
+
+        if x0 <= xlast <= x1:
+            return False
+
+        # page forward, the newest point ends up half way across
+
+        span = self._xspan or (x1 - x0)
+
+        x1 = xlast + 0.5 * span
+
+        self._axes.set_xlim(x1 - span, x1)
+
+        return True
+
+
     def _render(self, fig, x, y):
 
         # convert size to percent of figure
@@ -44,3 +302,12 @@ class Plot(Base):
         h /= H
 
         self._axes = fig.add_axes([x, y, w, h])
+
+        if self._capacity:
+
+            self._line, = self._axes.plot([], [], **self._line_kw)
+
+            if self._xspan:
+                self._axes.set_xlim(0, self._xspan)
+
+            self._animate(self._line)
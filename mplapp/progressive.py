@@ -0,0 +1,143 @@
+"""
+Progressive rendering, coarse while dragging and in full once released.
+
+Widgets that are dragged, a Slider while SLIDING or a Plot being panned,
+mark their Window as interacting.  A Progressive callback renders with a
+small evaluation budget while the Window is interacting, and schedules a
+full resolution pass when the drag ends, cancelled if a drag starts again
+before it runs.
+
+    def draw(budget, value):
+        t = np.linspace(0, 1, int(budget * 10000))
+        ...
+
+    Slider(..., notify = Progressive(draw, plot))
+"""
+
+
+class Progressive(object):
+    """
+    A widget callback that calls render(budget, *args).  budget is the
+    fraction of the full resolution to evaluate, coarse while the widget's
+    Window is interacting, 1.0 otherwise and for the final pass, run delay
+    seconds after the interaction ends.
+    """
+
+    COARSE = 0.1
+    DELAY = 0.1 # seconds
+
+
+    def __init__(self, render, widget, coarse = COARSE, delay = DELAY):
+
+        if not callable(render):
+            raise ValueError("render isn't callable!")
+
+        if not 0.0 < coarse <= 1.0:
+            raise ValueError('coarse must be in (0, 1]')
+
+        self._render = render
+        self._widget = widget
+        self._coarse = coarse
+        self._delay = delay
+
+        self._args = None     # arguments of the latest call
+        self._stale = False   # the latest render was coarse
+        self._window = None   # listened to once known
+        self._timer = None
+        self._timer_running = False
+
+        # statistics
+
+        self._n_coarse = 0
+        self._n_full = 0
+        self._n_cancelled = 0
+
+
+    def __call__(self, *args):
+
+        self._args = args
+
+        window = self._attach()
+
+        if window is not None and window.interacting():
+
+            self._stale = True
+            self._n_coarse += 1
+
+            self._widget._invoke(self._render, self._coarse, *args)
+
+        else:
+            self._cancel()
+            self._full()
+
+
+    def stats(self):
+        """
+        Returns a dict with the number of coarse and full renders and of
+        full passes cancelled by a new drag.
+        """
+
+        return dict(
+            coarse = self._n_coarse,
+            full = self._n_full,
+            cancelled = self._n_cancelled,
+        )
+
+
+    def _attach(self):
+
+        if self._window is None:
+
+            self._window = self._widget._window()
+
+            if self._window is not None:
+                self._window.add_interaction_listener(self._on_interaction)
+
+        return self._window
+
+
+    def _on_interaction(self, active):
+        """
+        Called by the Window when a drag starts or all drags ended.
+        """
+
+        if active:
+
+            if self._timer_running:
+                self._n_cancelled += 1
+
+            self._cancel()
+
+        elif self._stale:
+
+            if self._timer is None:
+                self._timer = self._widget.canvas().new_timer(
+                    interval = int(1000 * self._delay))
+                self._timer.single_shot = True
+                self._timer.add_callback(self._on_timer)
+
+            self._timer.start()
+            self._timer_running = True
+
+
+    def _on_timer(self):
+
+        self._timer_running = False
+
+        if self._stale:
+            self._full()
+
+
+    def _cancel(self):
+
+        if self._timer_running:
+            self._timer.stop()
+            self._timer_running = False
+
+
+    def _full(self):
+
+        self._stale = False
+        self._n_full += 1
+
+        self._widget._invoke(self._render, 1.0, *self._args)
@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class RingBuffer(object):
+    """
+    A fixed-capacity FIFO of numbers in a preallocated NumPy array.
+
+    Every value is stored twice, at i and i + capacity, in an array of twice
+    the capacity, so the last n values are always one contiguous slice and
+    view() returns it without copying.  Appending a scalar or an array
+    doesn't allocate.
+    """
+
+    def __init__(self, capacity, dtype = float):
+
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+
+        self._capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype = dtype)
+        self._head = 0  # next write position, in [0, capacity)
+        self._count = 0
+
+
+    def __len__(self):
+        return self._count
+
+
+    def capacity(self):
+        return self._capacity
+
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+
+    def append(self, value):
+        """
+        Appends a scalar.
+        """
+
+        h = self._head
+        c = self._capacity
+
+        self._data[h] = value
+        self._data[h + c] = value
+
+        self._head = (h + 1) % c
+
+        if self._count < c:
+            self._count += 1
+
+
+    def extend(self, values):
+        """
+        Appends an array, only the last capacity values are kept.
+        """
+
+        values = np.asarray(values)
+
+        c = self._capacity
+
+        if len(values) > c:
+            values = values[-c:]
+
+        k = len(values)
+
+        h = self._head
+
+        # up to the end of the primary half, then wrap around
+
+        k1 = min(k, c - h)
+        k2 = k - k1
+
+        data = self._data
+
+        data[h:h + k1] = values[:k1]
+        data[h + c:h + c + k1] = values[:k1]
+
+        if k2:
+            data[:k2] = values[k1:]
+            data[c:c + k2] = values[k1:]
+
+        self._head = (h + k) % c
+        self._count = min(self._count + k, c)
+
+
+    def view(self):
+        """
+        Returns the values, oldest first, as a view into the buffer, valid
+        until the next append.
+        """
+
+        end = self._head + self._capacity
+
+        return self._data[end - self._count:end]
+
+
+    def last(self):
+
+        if self._count == 0:
+            raise IndexError('last() of an empty RingBuffer')
+
+        return self._data[self._head + self._capacity - 1]
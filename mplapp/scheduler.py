@@ -0,0 +1,143 @@
+from matplotlib.transforms import Bbox
+
+
+class RedrawScheduler(object):
+    """
+    Coalesces redraw requests.
+
+    Widgets ask for a redraw with request(), the requests are collected until
+    the canvas timer fires on the next event-loop iteration, then all dirty
+    widgets are repainted with a single blit, or a single full draw if any
+    request needed one.
+    """
+
+    INTERVAL = 10 # milliseconds
+
+
+    def __init__(self, window, interval = INTERVAL):
+
+        self._window = window
+        self._interval = interval
+
+        self._timer = None
+        self._pending = False
+
+        self._full = False
+        self._dirty = []
+        self._dirty_axes = {} # widget -> list of axes, or None for all
+
+        # statistics
+
+        self._n_requests = 0
+        self._n_draws = 0
+        self._n_blits = 0
+
+
+    def request(self, widget = None, ax = None):
+        """
+        Schedules a repaint of the widget, or a full draw if widget is None.
+        If ax is given, only that axes of the widget is repainted.
+        """
+
+        self._n_requests += 1
+
+        if widget is None:
+            self._full = True
+
+        elif widget not in self._dirty_axes:
+            self._dirty.append(widget)
+            self._dirty_axes[widget] = None if ax is None else [ax]
+
+        else:
+
+            axes = self._dirty_axes[widget]
+
+            if ax is None:
+                self._dirty_axes[widget] = None
+
+            elif axes is not None and ax not in axes:
+                axes.append(ax)
+
+        if not self._pending:
+
+            self._pending = True
+
+            if self._timer is None:
+                self._timer = self._window.canvas().new_timer(
+                    interval = self._interval)
+                self._timer.single_shot = True
+                self._timer.add_callback(self._on_timer)
+
+            self._timer.start()
+
+
+    def _on_timer(self):
+
+        # looked up on each call, so that mplapp.instrument can time it
+
+        self.flush()
+
+
+    def flush(self):
+        """
+        Performs all pending redraws now.
+        """
+
+        self._pending = False
+
+        if self._timer is not None:
+            self._timer.stop()
+
+        full = self._full
+        dirty = self._dirty
+        dirty_axes = self._dirty_axes
+
+        self._full = False
+        self._dirty = []
+        self._dirty_axes = {}
+
+        # widgets bring their artists up to date once per repaint, which may
+        # need a full draw
+
+        for widget in dirty:
+            if widget._prepare_draw():
+                full = True
+
+        if full:
+            self._window.canvas().draw()
+            self._n_draws += 1
+
+        elif dirty:
+
+            bboxes = []
+
+            for widget in dirty:
+
+                bbs = self._window._repaint(widget, dirty_axes[widget])
+
+                # background missing, repaint everything
+
+                if bbs is None:
+                    self._window.canvas().draw()
+                    self._n_draws += 1
+                    return
+
+                bboxes.extend(bbs)
+
+            if bboxes:
+                self._window.canvas().blit(Bbox.union(bboxes))
+                self._n_blits += 1
+
+
+    def stats(self):
+        """
+        Returns a dict with the number of redraw requests, full draws and
+        blits performed, and the number of redundant redraws that were saved.
+        """
+
+        return dict(
+            requests = self._n_requests,
+            draws = self._n_draws,
+            blits = self._n_blits,
+            saved = self._n_requests - self._n_draws - self._n_blits,
+        )
@@ -1,3 +1,5 @@
+import time
+
 import matplotlib
 from matplotlib.patches import Rectangle
 
@@ -8,14 +10,33 @@ from mplapp.base import Base
 class Slider(Base):
     """
     A slider that responds to mouse clicks and motion
+
+    While dragging, the slider follows the pointer but notify is called
+    according to the policy keyword:
+
+        'continuous'  : the latest value once per event-loop iteration, the
+                        motion events received in between are coalesced
+        throttled(hz) : the latest value at most hz times per second
+        'on_release'  : only the final value, when the mouse is released
+
+    With resolution, values snap to vmin + n * resolution.  While dragging,
+    notify is only called when the value changes, value(v) always calls it.
+
+    While SLIDING the slider's Window is interacting, so a Progressive
+    notify renders coarse until the final value is delivered on release.
     """
 
+    CONTINUOUS = 'continuous'
+    ON_RELEASE = 'on_release'
+
     IDLE = 0
     SLIDING = 1
 
     HORIZONTAL = 0
     VERTICAL = 1
 
+    _setters = ('value',)
+
     def __init__(self, width, height, **kwargs):
 
         self._notify = kwargs.get('notify', None)
@@ -24,6 +45,15 @@ class Slider(Base):
         self._vmin = kwargs.get('vmin', 0.0)
         self._vrange = self._vmax - self._vmin
 
+        self._policy = kwargs.get('policy', self.CONTINUOUS)
+        self._resolution = kwargs.get('resolution', None)
+
+        if (
+            self._policy not in [self.CONTINUOUS, self.ON_RELEASE] and
+            not isinstance(self._policy, _Throttled)
+        ):
+            raise ValueError('unknown notify policy %s' % repr(self._policy))
+
         if width > height:
             self._orientation = self.HORIZONTAL
         else:
@@ -60,6 +90,14 @@ class Slider(Base):
 
         self._state = self.IDLE
 
+        # deferred notify
+
+        self._notified = self._vinit
+        self._notify_time = 0.0
+        self._pending = False
+        self._timer = None
+        self._timer_running = False
+
 
     def axes(self):
         if self._axes:
@@ -88,16 +126,116 @@ class Slider(Base):
 
         else:
 
-            if self._orientation == self.HORIZONTAL:
-                self._rect.set_width(new_value)
+            new_value = self._quantize(new_value)
 
-            else:
-                self._rect.set_height(new_value)
+            self._show(new_value)
+
+            # setting the value always notifies, the policy only governs
+            # drags, a drag notification still pending is superseded
+
+            self._pending = False
+
+            if self._timer_running:
+                self._timer.stop()
+                self._timer_running = False
+
+            self._notify_value(new_value, force = True)
+
+
+    def _show(self, new_value):
+
+        if self._orientation == self.HORIZONTAL:
+            self._rect.set_width(new_value)
+
+        else:
+            self._rect.set_height(new_value)
+
+        self._redraw()
+
+
+    def _quantize(self, v):
+
+        if self._resolution:
+
+            n = round((v - self._vmin) / self._resolution)
+
+            v = min(self._vmin + n * self._resolution, self._vmax)
+
+        return v
+
+
+    def _drag_to(self, new_value):
+        """
+        Moves the slider to follow the pointer, notify is deferred according
+        to the policy.
+        """
+
+        new_value = self._quantize(new_value)
+
+        if new_value == self.value():
+            return
+
+        self._show(new_value)
+
+        if self._policy == self.ON_RELEASE:
+            return
+
+        self._pending = True
+
+        self._schedule_notify()
+
+
+    def _schedule_notify(self):
+
+        if self._timer_running:
+            return
+
+        delay = 0.0
+
+        if isinstance(self._policy, _Throttled):
+
+            elapsed = time.time() - self._notify_time
+
+            delay = max(0.0, 1.0 / self._policy.hz - elapsed)
+
+        if self._timer is None:
+            self._timer = self.canvas().new_timer()
+            self._timer.single_shot = True
+            self._timer.add_callback(self._flush_notify)
 
-            self.canvas().draw_idle()
+        self._timer.interval = int(1000 * delay)
+        self._timer.start()
 
-            if self._notify:
-                self._notify(new_value)
+        self._timer_running = True
+
+
+    def _flush_notify(self):
+        """
+        Delivers the latest value if one is pending.
+        """
+
+        if self._timer_running:
+            self._timer.stop()
+            self._timer_running = False
+
+        if not self._pending:
+            return
+
+        self._pending = False
+
+        self._notify_value(self.value())
+
+
+    def _notify_value(self, new_value, force = False):
+
+        if new_value == self._notified and not force:
+            return
+
+        self._notified = new_value
+        self._notify_time = time.time()
+
+        if self._notify:
+            self._invoke(self._notify, new_value)
 
 
     def _render(self, fig, x, y):
@@ -157,14 +295,28 @@ class Slider(Base):
 
         self._axes = ax
 
-        self.canvas().mpl_connect(
-            'button_press_event', self._on_mouse_click)
+        self._animate(self._rect)
 
-        self.canvas().mpl_connect(
-            'button_release_event', self._on_mouse_release)
+        self._connect('button_press_event', self._on_mouse_click)
+        self._connect('button_release_event', self._on_mouse_release)
+        self._connect('motion_notify_event', self._on_mouse_motion)
 
-        self._cid_motion = self.canvas().mpl_connect(
-            'motion_notify_event', self._on_mouse_motion)
+
+    def _event_value(self, event):
+        """
+        Converts the event's pixel position to a slider value, the pointer may
+        be outside the axes while the slider has captured it.
+        """
+
+        x, y = self._axes.transData.inverted().transform((event.x, event.y))
+
+        if self._orientation == self.HORIZONTAL:
+            v = x
+
+        else:
+            v = y
+
+        return min(max(v, self._vmin), self._vmax)
 
 
     def _on_mouse_click(self, event):
@@ -172,32 +324,61 @@ class Slider(Base):
         if event.inaxes != self._axes:
             return
 
-        if self._orientation == self.HORIZONTAL:
-            self.value(event.xdata)
-
-        else:
-            self.value(event.ydata)
+        self._drag_to(self._event_value(event))
 
         self._state = self.SLIDING
 
+        self._capture()
+
+        self._begin_interaction()
+
 
     def _on_mouse_release(self, event):
-        if event.inaxes != self._axes:
+
+        if self._state != self.SLIDING:
             return
 
         self._state = self.IDLE
 
+        self._release()
 
-    def _on_mouse_motion(self, event):
+        # the final value is delivered now, whatever the policy
 
-        if event.inaxes != self._axes:
-            return
+        self._pending = True
+
+        self._flush_notify()
+
+        self._end_interaction()
+
+
+    def _on_mouse_motion(self, event):
 
         if self._state != self.SLIDING:
             return
 
-        if self._orientation == self.HORIZONTAL:
-            self.value(event.xdata)
+        self._drag_to(self._event_value(event))
 
-        else:
-            self.value(event.ydata)
+
+def throttled(hz):
+    """
+    Returns a Slider notify policy that calls notify at most hz times per
+    second while dragging.
+    """
+    return _Throttled(hz)
+
+
+#------------------------------------------------------------------------------
+# Support classes
+
+class _Throttled(object):
+
+    def __init__(self, hz):
+
+        if hz <= 0:
+            raise ValueError('hz must be positive')
+
+        self.hz = float(hz)
+
+
+    def __repr__(self):
+        return 'throttled(%g)' % self.hz
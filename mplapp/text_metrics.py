@@ -0,0 +1,515 @@
+"""
+Character position measurement for single line Text artists.
+
+Measuring the position of every character by laying out every prefix of the
+string is O(N^2).  Instead, the rendered widths of single glyphs and of glyph
+pairs are cached per font, the width of each prefix is the width of the
+previous prefix plus a pair delta, which includes the kerning, so all the
+positions are computed with one cumulative sum.
+
+The rendered width is the extent of the ink, and a glyph may overhang the
+next one, e.g. 'fi' or 'T.'.  A delta measured against the last glyph alone
+then misses the overhang, and the error adds up along the string, so glyphs
+are measured against the two glyphs before them.
+"""
+
+import numpy as np
+
+
+class GlyphCache(object):
+    """
+    Rendered string widths in pixels, cached per (font properties, size, dpi,
+    renderer).
+    """
+
+    def __init__(self):
+        self._fonts = {}
+
+
+    def clear(self):
+        self._fonts = {}
+
+
+    def widths(self, renderer, prop, dpi):
+        """
+        Returns the width cache dict for the font.
+        """
+
+        key = (hash(prop), prop.get_size_in_points(), dpi, type(renderer))
+
+        widths = self._fonts.get(key, None)
+
+        if widths is None:
+            widths = {}
+            self._fonts[key] = widths
+
+        return widths
+
+
+_glyph_cache = GlyphCache()
+
+
+# number of characters measured at a time when fitting text into a width
+
+_CHUNK = 64
+
+
+class TextMeasure(object):
+    """
+    Measures the glyph deltas of a Text artist using the shared GlyphCache.
+    """
+
+    def __init__(self, text):
+
+        self._text = text
+
+        self._renderer = _get_renderer(text)
+        self._prop = text.get_fontproperties()
+
+        self._widths = _glyph_cache.widths(
+            self._renderer, self._prop, text.figure.dpi)
+
+        # Depending on the backend, the rendered width ignores leading &
+        # trailing whitespace, so measure the width of a space between glyphs
+        # and the width a trailing space adds.
+
+        self.space_width = self.width('# #') - self.width('##')
+        self.space_delta = self.width('# ') - self.width('#')
+
+
+    def width(self, sub):
+        """
+        Returns the rendered width of the string in pixels.
+        """
+
+        w = self._widths.get(sub, None)
+
+        if w is None:
+            w = self._renderer.get_text_width_height_descent(
+                sub, self._prop, False)[0]
+            self._widths[sub] = w
+
+        return w
+
+
+    def origin(self):
+        """
+        Returns the pixel x position of the left edge of the text.
+        """
+
+        text = self._text
+
+        return text.get_transform().transform(text.get_position())[0]
+
+
+    def deltas(self, s, i0 = 0, i1 = None):
+        """
+        Returns how much each character in s[i0:i1] adds to the rendered width
+        of the prefix ending with it.  The delta of a glyph is measured against
+        the last glyph before it, or the last two when they're adjacent, which
+        accounts for kerning and overhangs.
+        """
+
+        if i1 is None:
+            i1 = len(s)
+
+        width = self.width
+
+        out = np.zeros(max(i1 - i0, 0))
+
+        # index of the last non space character before i0
+
+        last = i0 - 1
+
+        while last >= 0 and s[last] == ' ':
+            last -= 1
+
+        if last < 0:
+            last = None
+
+        for i in range(i0, i1):
+
+            c = s[i]
+
+            if c == ' ':
+                out[i - i0] = self.space_delta
+                continue
+
+            n_spaces = i - 1 - last if last is not None else i
+
+            if n_spaces == 0:
+
+                if last is None:
+                    out[i - i0] = width(c)
+
+                else:
+
+                    # the glyph before the last one may overhang it, e.g.
+                    # 'fi' or 'T.', measure against both
+
+                    prev = s[last]
+
+                    if last > 0 and s[last - 1] != ' ':
+                        prev = s[last - 1] + prev
+
+                    out[i - i0] = width(prev + c) - width(prev)
+
+            elif last is None:
+                out[i - i0] = width(' ' + c) - width(' ')
+
+            else:
+                prev = s[last] + ' '
+                out[i - i0] = (
+                    width(prev + c) - width(prev) +
+                    (n_spaces - 1) * (self.space_width - self.space_delta)
+                )
+
+            last = i
+
+        return out
+
+
+    def corrections(self, s, i0 = 0):
+        """
+        Returns the space adjustments, same as measure_per_prefix(), for the
+        positions i0 + 1 .. len(s).
+        """
+
+        spaces = _space_mask(s[i0:])
+
+        out = spaces * self.space_width
+
+        if len(s) > 0 and s[0] == ' ':
+            out += self.space_width
+
+        return out
+
+
+    def fit_forward(self, s, start, width):
+        """
+        Returns the largest end such that s[start:end] renders within width
+        pixels, only the characters that fit are measured.
+        """
+
+        end = start
+        total = 0.0
+
+        while end < len(s):
+
+            d = self.deltas(s, end, min(end + _CHUNK, len(s)))
+
+            c = np.cumsum(d) + total
+
+            n = int(np.searchsorted(c, width, side = 'right'))
+
+            if n < len(d):
+                return end + n
+
+            total = c[-1]
+            end += len(d)
+
+        return len(s)
+
+
+    def fit_backward(self, s, end, width):
+        """
+        Returns the smallest start such that s[start:end] renders within width
+        pixels, only the characters that fit are measured.
+        """
+
+        start = end
+        total = 0.0
+
+        while start > 0:
+
+            i0 = max(0, start - _CHUNK)
+
+            d = self.deltas(s, i0, start)[::-1]
+
+            c = np.cumsum(d) + total
+
+            n = int(np.searchsorted(c, width, side = 'right'))
+
+            if n < len(d):
+                return start - n
+
+            total = c[-1]
+            start = i0
+
+        return 0
+
+
+def text_positions(text):
+    '''
+    For each character in the text object, return a list pixel values for
+    the start of each character.
+
+    Note, this returns a list that is len(text) + 1, so that the end of the
+    last character can be determined.
+    '''
+
+    s = str(text.get_text())
+
+    if not _is_simple(text, s):
+        return measure_per_prefix(text)
+
+    m = TextMeasure(text)
+
+    x = np.zeros(len(s) + 1)
+
+    x[1:] = np.cumsum(m.deltas(s)) + m.corrections(s)
+
+    return list(m.origin() + x)
+
+
+class CaretTable(object):
+    """
+    The caret positions of a Text artist, relative to the left edge of the
+    text, kept for one version of the text.
+
+    When part of the text is replaced, only the glyphs of the edit are
+    measured and only the positions after the edit point are recomputed.
+    """
+
+    def __init__(self, text):
+
+        self._text = text
+
+        self._version = None
+
+        self._origin = None
+        self._measure = None
+        self._deltas = None
+        self._widths = None
+        self._positions = None
+
+
+    def version(self):
+        return self._version
+
+
+    def invalidate(self):
+        self._version = None
+
+
+    def rebuild(self, version):
+
+        text = self._text
+
+        s = str(text.get_text())
+
+        self._version = version
+
+        if not _is_simple(text, s):
+
+            self._measure = None
+            self._deltas = None
+
+            x = np.array(measure_per_prefix(text))
+
+            self._origin = x[0]
+
+            self._positions = x - x[0]
+
+            return
+
+        m = TextMeasure(text)
+
+        self._measure = m
+
+        self._deltas = np.zeros(len(s) + 1)
+        self._deltas[1:] = m.deltas(s)
+
+        self._widths = np.cumsum(self._deltas)
+
+        self._positions = self._widths.copy()
+        self._positions[1:] += m.corrections(s)
+
+
+    def edit(self, i0, i1, n_new, version):
+        """
+        Updates the table after the characters [i0, i1) of the previous
+        version were replaced by n_new characters, the Text artist already
+        holds the new text.
+        """
+
+        text = self._text
+
+        s = str(text.get_text())
+
+        if (
+            self._version is None or
+            self._version != version - 1 or
+            self._measure is None or
+            not _is_simple(text, s)
+        ):
+            self.rebuild(version)
+            return
+
+        m = self._measure
+
+        # the first two glyphs after the edit are measured against the glyphs
+        # before them, which may have changed, the rest are unchanged
+
+        j = i0 + n_new
+
+        end = j
+
+        while end < len(s) and s[end] == ' ':
+            end += 1
+
+        end = min(end + 2, len(s))
+
+        # the leading space adjustment changes every position
+
+        if i0 == 0:
+            self.rebuild(version)
+            return
+
+        self._deltas = np.concatenate([
+            self._deltas[:i0 + 1],
+            m.deltas(s, i0, end),
+            self._deltas[end - j + i1 + 1:],
+        ])
+
+        widths = np.empty(len(s) + 1)
+        widths[:i0 + 1] = self._widths[:i0 + 1]
+        widths[i0 + 1:] = widths[i0] + np.cumsum(self._deltas[i0 + 1:])
+
+        positions = np.empty(len(s) + 1)
+        positions[:i0 + 1] = self._positions[:i0 + 1]
+        positions[i0 + 1:] = widths[i0 + 1:] + m.corrections(s, i0)
+
+        self._widths = widths
+        self._positions = positions
+        self._version = version
+
+
+    def positions(self):
+        """
+        Returns the pixel x positions of each caret position.
+        """
+
+        if self._measure is None:
+            return self._origin + self._positions
+
+        return self._measure.origin() + self._positions
+
+
+    def index_at(self, x):
+        """
+        Returns the caret index nearest to the pixel x position.
+        """
+
+        pos = self.positions()
+
+        idx = int(np.searchsorted(pos, x))
+
+        if idx == 0:
+            return 0
+
+        if idx == len(pos):
+            return idx - 1
+
+        if pos[idx] - x < x - pos[idx - 1]:
+            return idx
+
+        return idx - 1
+
+
+def measure_per_prefix(text):
+    '''
+    Reference implementation of text_positions(), renders every prefix of the
+    string, O(N^2).
+    '''
+
+    orig = text.get_text()
+
+    #--------------------------------------------------------------------------
+    # the backend render ignores leading trailing whitespace, so lets directly
+    # measure the width of a space
+
+    text.set_text('##')
+
+    bb = text.get_window_extent()
+
+    width0 = bb.width
+
+    text.set_text('# #')
+
+    bb = text.get_window_extent()
+
+    width1 = bb.width
+
+    space_width = width1 - width0
+
+    #--------------------------------------------------------------------------
+    # measure the position of each character
+
+    s = str(orig)
+
+    N = len(s)
+
+    x_positions = [bb.x0]
+
+    for i in range(1, N + 1):
+
+        txt = s[0:i]
+
+        text.set_text(txt)
+
+        bb = text.get_window_extent()
+
+        x = bb.x0 + bb.width
+
+        # adjust for spaces
+        if txt[0] == ' ':
+            x += space_width
+
+        if i > 0 and txt[-1] == ' ':
+            x += space_width
+
+        x_positions.append(x)
+
+    # restore text
+
+    text.set_text(orig)
+
+    return x_positions
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _is_simple(text, s):
+    """
+    The glyph cache handles left aligned, unrotated, single line plain text.
+    """
+
+    return (
+        text.get_horizontalalignment() == 'left' and
+        text.get_rotation() == 0 and
+        '\n' not in s and
+        '$' not in s and
+        not text.get_usetex()
+    )
+
+
+def _get_renderer(text):
+
+    canvas = text.figure.canvas
+
+    if hasattr(canvas, 'get_renderer'):
+        return canvas.get_renderer()
+
+    return text.figure._cachedRenderer
+
+
+def _space_mask(s):
+    """
+    Returns a float array, 1.0 where the character is a space.
+    """
+
+    codes = np.frombuffer(s.encode('utf-32-le'), dtype = np.uint32)
+
+    return (codes == 32).astype(float)
@@ -0,0 +1,198 @@
+"""
+Records sessions of interactions with mplapp windows and exports them as
+traces.
+
+    from mplapp import trace
+
+    with trace.record() as session:
+        plt.show()
+
+    session.save_chrome('session.json')
+    session.save_folded('session.folded')
+
+The session holds the calls timed by mplapp.instrument while recording,
+nested by time: an event dispatch contains the widget handlers it called,
+which contain their state transitions, text measurement, callbacks and so
+on.  save_chrome() writes Chrome trace-event JSON, loaded by
+chrome://tracing or https://ui.perfetto.dev, save_folded() writes folded
+stacks of self times in microseconds for flamegraph.pl or speedscope.
+"""
+
+import contextlib
+import json
+
+
+from mplapp import instrument
+
+
+EVENTS = 1000000 # calls kept, the oldest are dropped from longer sessions
+
+
+def start(events = EVENTS):
+    """
+    Starts recording, enabling the instrumentation.
+    """
+    instrument.enable(events = events)
+
+
+def stop():
+    """
+    Stops recording, disabling the instrumentation, returns the Session.
+    """
+
+    instrument.disable()
+
+    return Session(instrument.events())
+
+
+@contextlib.contextmanager
+def record(events = EVENTS):
+    """
+    Records the block, the Session yielded is filled in when it exits.
+    """
+
+    session = Session([])
+
+    start(events)
+
+    try:
+        yield session
+
+    finally:
+        instrument.disable()
+        session._set(_nest(instrument.events()))
+
+
+class Session(object):
+    """
+    A recording, its spans are (start, duration, depth, kind, widget type,
+    widget id, name) tuples, in seconds from the first one, in start order.
+    """
+
+    def __init__(self, events):
+        self._set(_nest(events))
+
+
+    def __len__(self):
+        return len(self._spans)
+
+
+    def spans(self):
+        return list(self._spans)
+
+
+    def chrome(self):
+        """
+        Returns the session as a Chrome trace-event dict, a complete ('X')
+        event per span, in microseconds.
+        """
+
+        trace_events = [
+            dict(
+                name = 'process_name',
+                ph = 'M',
+                pid = 1,
+                tid = 1,
+                args = dict(name = 'mplapp'),
+            ),
+        ]
+
+        for start, duration, depth, kind, wtype, wid, name in self._spans:
+
+            trace_events.append(dict(
+                name = _label(wtype, name),
+                cat = kind,
+                ph = 'X',
+                ts = 1e6 * start,
+                dur = 1e6 * duration,
+                pid = 1,
+                tid = 1,
+                args = dict(widget = '%s@%x' % (wtype, wid)),
+            ))
+
+        return dict(traceEvents = trace_events, displayTimeUnit = 'ms')
+
+
+    def save_chrome(self, path):
+
+        with open(path, 'w') as fd:
+            json.dump(self.chrome(), fd)
+
+
+    def folded(self):
+        """
+        Returns a dict mapping the stacks, their frames 'kind Type.name'
+        joined by ';', to their self time in microseconds.
+        """
+
+        stacks = {}
+
+        path = []  # frames of the enclosing spans
+
+        for start, duration, depth, kind, wtype, wid, name in self._spans:
+
+            del path[depth:]
+
+            # the time of a span's children isn't its own
+
+            if path:
+                stack = ';'.join(path)
+                stacks[stack] = stacks.get(stack, 0.0) - 1e6 * duration
+
+            path.append('%s %s' % (kind, _label(wtype, name)))
+
+            stack = ';'.join(path)
+            stacks[stack] = stacks.get(stack, 0.0) + 1e6 * duration
+
+        return stacks
+
+
+    def save_folded(self, path):
+
+        with open(path, 'w') as fd:
+
+            for stack, us in sorted(self.folded().items()):
+                fd.write('%s %d\n' % (stack, max(int(round(us)), 0)))
+
+
+    def _set(self, spans):
+        self._spans = spans
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _nest(events):
+    """
+    Converts instrument events to spans, a span's depth is the number of
+    spans containing it.
+    """
+
+    if not events:
+        return []
+
+    # enclosing spans start first, or at the same time and last longer
+
+    events = sorted(events, key = lambda e: (e[4], -e[5]))
+
+    t0 = events[0][4]
+
+    spans = []
+
+    ends = [] # end times of the enclosing spans
+
+    for kind, wtype, wid, name, start, duration in events:
+
+        while ends and start >= ends[-1]:
+            ends.pop()
+
+        spans.append(
+            (start - t0, duration, len(ends), kind, wtype, wid, name))
+
+        ends.append(start + duration)
+
+    return spans
+
+
+def _label(wtype, name):
+    return '%s.%s' % (wtype, name)
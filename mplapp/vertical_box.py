@@ -65,6 +65,10 @@ class VerticalBox(Base):
         raise RuntimeError('VericalBox does not have a canvas')
 
 
+    def _children(self):
+        return [widget for widget, _ in self._widgets]
+
+
     def size(self):
         """
         Returns the minimum size of this box in inches.
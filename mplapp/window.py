@@ -4,11 +4,44 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 
 
+from mplapp.call_queue import CallQueue
+from mplapp.dispatcher import EventDispatcher
+from mplapp.focus import FocusManager
+from mplapp.scheduler import RedrawScheduler
+
+
 class Window(object):
     """
     A window in which to add widgets.
+
+    The window also owns the blitting render engine.  Widgets mark their
+    dynamic artists as animated, the static background behind each widget's
+    axes is cached after every full draw, and a widget is repainted by
+    restoring its background, drawing its animated artists and blitting only
+    its own axes region, along with the animated axes drawn over it, e.g. an
+    open dropdown.  Repaints are requested through request_redraw() and
+    coalesced by a RedrawScheduler into one draw or blit per event-loop
+    iteration.
+
+    Canvas events are routed to widgets by a single EventDispatcher, key
+    events only go to the widget focused in the FocusManager.
+
+    Other threads update widgets through call_soon(), the calls are queued
+    and run in batches on the GUI thread.
+
+    Widgets being dragged mark the window as interacting, listeners are told
+    when the first drag starts and when the last one ends, e.g. Progressive
+    callbacks render coarse in between.
     """
 
+    @staticmethod
+    def find(fig):
+        """
+        Returns the Window that owns the figure, or None.
+        """
+        return getattr(fig, '_mplapp_window', None)
+
+
     def __init__(self, box, title = 'Window', padding = 0.10, toolbar = False):
         """
         width & height in inches
@@ -42,11 +75,40 @@ class Window(object):
 
         self._fig.canvas.set_window_title(title)
 
+        # the figure keeps its Window alive, and both are freed once the
+        # figure is closed
+
+        self._fig._mplapp_window = self
+
+        #----------------------------------------------------------------------
+        # blitting state
+
+        self._can_blit = hasattr(self._fig.canvas, 'copy_from_bbox')
+
+        self._widget_axes = {}  # widget -> list of axes
+        self._animated = {}     # axes -> list of animated artists
+        self._backgrounds = {}  # axes -> saved background region
+
+        self._fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+        self._scheduler = RedrawScheduler(self)
+
+        self._focus = FocusManager()
+
+        self._dispatcher = EventDispatcher(self._fig.canvas, self._focus)
+
+        self._calls = CallQueue(self._fig.canvas)
+
+        self._interacting = set()       # widgets being dragged
+        self._interaction_listeners = []
+
         x = padding
         y = padding
 
         box._render(self._fig, x, y)
 
+        self._focus.set_order(_walk(box))
+
         # restore default rcparams
         mpl.rcParams['toolbar'] = orig_toolbar_settig
 
@@ -61,3 +123,305 @@ class Window(object):
                 rcParams[key] = ''
 
         self._rc_keys_disabled = {}
+
+
+    def figure(self):
+        return self._fig
+
+
+    def canvas(self):
+        return self._fig.canvas
+
+
+    def connect(self, widget, name, handler):
+        """
+        Connects a widget's event handler through the window's dispatcher,
+        returns a connection id for disconnect().
+        """
+        return self._dispatcher.connect(widget, name, handler)
+
+
+    def disconnect(self, cid):
+        self._dispatcher.disconnect(cid)
+
+
+    def capture(self, widget):
+        """
+        Routes all mouse events to the widget until release() is called.
+        """
+        self._dispatcher.capture(widget)
+
+
+    def release(self, widget):
+        self._dispatcher.release(widget)
+
+
+    def begin_interaction(self, widget):
+        """
+        Marks the widget as being dragged until end_interaction() is called.
+        """
+
+        first = not self._interacting
+
+        self._interacting.add(widget)
+
+        if first:
+            for listener in list(self._interaction_listeners):
+                listener(True)
+
+
+    def end_interaction(self, widget):
+
+        if widget not in self._interacting:
+            return
+
+        self._interacting.discard(widget)
+
+        if not self._interacting:
+            for listener in list(self._interaction_listeners):
+                listener(False)
+
+
+    def interacting(self):
+        return bool(self._interacting)
+
+
+    def add_interaction_listener(self, listener):
+        """
+        Calls listener(True) when a drag starts while none was, and
+        listener(False) when the last drag ends.
+        """
+        self._interaction_listeners.append(listener)
+
+
+    def focus(self, widget):
+        """
+        Gives the widget keyboard focus, or clears it if widget is None.
+        """
+        self._focus.focus(widget)
+
+
+    def focused(self):
+        return self._focus.focused()
+
+
+    def call_soon(self, func, *args, **kwargs):
+        """
+        Runs func(*args) on the GUI thread, may be called from any thread.
+        Repeated calls to a widget setter, e.g. label.text, or with the same
+        key = ... keyword, within one tick collapse to the last one.
+        """
+
+        key = kwargs.pop('key', None)
+
+        if kwargs:
+            raise TypeError('unexpected keywords %s' % sorted(kwargs))
+
+        self._calls.put(func, args, key)
+
+
+    def call_soon_stats(self):
+        return self._calls.stats()
+
+
+    def add_animated(self, widget, *artists):
+        """
+        Marks the artists as animated, they are excluded from the cached
+        background and repainted when the widget is blitted.
+        """
+
+        if not self._can_blit:
+            return
+
+        for artist in artists:
+
+            # an Axes' background patch has no axes set, it's the widget's
+
+            ax = artist.axes or widget.axes()
+
+            artist.set_animated(True)
+
+            self._animated.setdefault(ax, []).append(artist)
+
+            axes = self._widget_axes.setdefault(widget, [])
+
+            if ax not in axes:
+                axes.append(ax)
+
+
+    def remove_animated(self, *artists):
+
+        for artist in artists:
+            for lst in self._animated.values():
+                if artist in lst:
+                    lst.remove(artist)
+
+
+    def request_redraw(self, widget = None, ax = None):
+        """
+        Schedules a repaint of the widget, or a full draw if widget is None.
+        If ax is given, only that axes of the widget is repainted.  Requests
+        are coalesced until the next event-loop iteration.
+        """
+        self._scheduler.request(widget, ax)
+
+
+    def flush_redraws(self):
+        """
+        Performs the pending redraw requests now rather than on the next
+        event-loop iteration.
+        """
+        self._scheduler.flush()
+
+
+    def redraw_stats(self):
+        return self._scheduler.stats()
+
+
+    def blit(self, widget):
+        """
+        Immediately repaints only the axes of the widget.
+        """
+
+        bboxes = self._repaint(widget)
+
+        if bboxes is None:
+            self._fig.canvas.draw_idle()
+            return
+
+        for bbox in bboxes:
+            self._fig.canvas.blit(bbox)
+
+
+    def _repaint(self, widget, axes = None):
+        """
+        Restores the background of the widget's axes, or only the given axes,
+        and draws its animated artists, returns the list of regions to blit,
+        or None if a full draw is needed instead.
+        """
+
+        canvas = self._fig.canvas
+
+        if axes is None:
+            axes = self._widget_axes.get(widget, None)
+
+        # nothing animated or no background cached yet?
+
+        if not axes or not self._backgrounds:
+            return None
+
+        axes = self._with_overlapping(
+            [ax for ax in axes if ax.get_visible()])
+
+        bboxes = []
+
+        for ax in axes:
+
+            bg = self._backgrounds.get(ax, None)
+
+            if bg is None:
+                return None
+
+            canvas.restore_region(bg)
+
+            self._draw_animated(ax)
+
+            bboxes.append(ax.bbox)
+
+        return bboxes
+
+
+    def _with_overlapping(self, axes):
+        """
+        Returns the axes and the visible animated axes drawn above and
+        overlapping them, e.g. an open dropdown, in drawing order.  Restoring
+        a background would otherwise wipe what is drawn over it.
+        """
+
+        out = list(axes)
+
+        others = [
+            ax for ax in self._animated if ax.get_visible() and ax not in out]
+
+        for ax in self._drawing_order(others):
+
+            if any(
+                self._above(ax, below) and _overlap(ax.bbox, below.bbox)
+                for below in out
+            ):
+                out.append(ax)
+
+        return self._drawing_order(out)
+
+
+    def _drawing_order(self, axes):
+        """
+        Returns the axes sorted as the figure draws them, by zorder then in
+        the order they were added.
+        """
+
+        order = self._fig.axes
+
+        return sorted(axes, key = lambda ax: (ax.get_zorder(), order.index(ax)))
+
+
+    def _above(self, ax, other):
+        return self._drawing_order([ax, other])[0] is other
+
+
+    def _draw_animated(self, ax):
+
+        artists = sorted(self._animated[ax], key = lambda a: a.get_zorder())
+
+        for artist in artists:
+            ax.draw_artist(artist)
+
+
+    def _on_draw(self, event):
+        """
+        Called after every full draw, cache the static background behind each
+        widget and paint the animated artists on top of it.
+        """
+
+        canvas = self._fig.canvas
+
+        self._backgrounds = {}
+
+        visible = self._drawing_order(
+            [ax for ax in self._animated if ax.get_visible()])
+
+        # capture all backgrounds before painting, axes may overlap
+
+        for ax in visible:
+            self._backgrounds[ax] = canvas.copy_from_bbox(ax.bbox)
+
+        for i, ax in enumerate(visible):
+
+            # painted over by the animated artists of an axes below it?
+
+            if any(_overlap(ax.bbox, below.bbox) for below in visible[:i]):
+                canvas.restore_region(self._backgrounds[ax])
+
+            self._draw_animated(ax)
+
+
+#------------------------------------------------------------------------------
+# Support functions
+
+def _overlap(a, b):
+    """
+    True if the bboxes share more than an edge.
+    """
+    return a.x0 < b.x1 and b.x0 < a.x1 and a.y0 < b.y1 and b.y0 < a.y1
+
+
+def _walk(widget):
+    """
+    Yields the widget and all the widgets it contains, in layout order.
+    """
+
+    yield widget
+
+    for child in widget._children():
+        for w in _walk(child):
+            yield w
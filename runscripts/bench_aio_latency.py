@@ -0,0 +1,154 @@
+"""
+Measures GUI event latency under plt.show() and under the asyncio runner.
+
+A worker thread posts time stamped calls with Window.call_soon() at a fixed
+rate, the latency is the time until each call runs on the GUI thread.  The
+process CPU time shows the asyncio pump doesn't busy-wait.  Needs an
+interactive backend.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+
+
+from mplapp import aio
+from mplapp.window import Window
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.label import Label
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--duration',
+        type = float,
+        default = 5.0,
+        help = 'Seconds to run each loop.'
+    )
+
+    parser.add_argument(
+        '--rate',
+        type = float,
+        default = 100.0,
+        help = 'Calls posted per second.'
+    )
+
+    args = parser.parse_args()
+
+    if matplotlib.get_backend().lower() in ['agg', 'pdf', 'ps', 'svg']:
+        print('needs an interactive backend, not %s' % matplotlib.get_backend())
+        return
+
+    print('%10s  %8s  %8s  %8s  %8s  %10s' % (
+        'loop', 'calls', 'p50 (ms)', 'p99 (ms)', 'max (ms)', 'cpu (s)'))
+
+    for name, run in [('plt.show', _run_show), ('asyncio', _run_asyncio)]:
+
+        latencies = []
+
+        window = _make_window(name)
+
+        producer = _Producer(window, latencies, args.rate)
+
+        c0 = time.process_time()
+
+        producer.start()
+
+        run(window, args.duration)
+
+        producer.stop()
+
+        cpu = time.process_time() - c0
+
+        ms = 1000.0 * np.array(latencies)
+
+        print('%10s  %8d  %8.2f  %8.2f  %8.2f  %10.2f' % (
+            name,
+            len(ms),
+            np.percentile(ms, 50),
+            np.percentile(ms, 99),
+            ms.max(),
+            cpu,
+        ))
+
+
+def _make_window(name):
+
+    vbox = VBox()
+
+    vbox.append(Label(4, 1, 'latency: %s' % name))
+
+    return Window(vbox, 'latency benchmark')
+
+
+def _run_show(window, duration):
+
+    timer = window.canvas().new_timer(interval = int(1000 * duration))
+    timer.single_shot = True
+    timer.add_callback(plt.close, window.figure())
+    timer.start()
+
+    plt.show()
+
+
+def _run_asyncio(window, duration):
+
+    async def close_later():
+        await asyncio.sleep(duration)
+        plt.close(window.figure())
+
+    async def main():
+        asyncio.ensure_future(close_later())
+        await aio.run(window)
+
+    asyncio.get_event_loop().run_until_complete(main())
+
+
+class _Producer(object):
+
+    def __init__(self, window, latencies, rate):
+
+        self._window = window
+        self._latencies = latencies
+        self._period = 1.0 / rate
+        self._running = False
+        self._thread = None
+
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target = self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+
+
+    def _run(self):
+
+        latencies = self._latencies
+
+        # a plain function, calls to it never collapse
+
+        def record(t):
+            latencies.append(time.time() - t)
+
+        while self._running:
+            self._window.call_soon(record, time.time())
+            time.sleep(self._period)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measures the draw time of a Plot series against its length, decimated with
+Plot.series() and drawn at full resolution with Axes.plot().
+"""
+
+import argparse
+import time
+
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+
+from mplapp.window import Window
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.plot import Plot
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--sizes',
+        type = int,
+        nargs = '+',
+        default = [10 ** 5, 10 ** 6, 10 ** 7],
+        help = 'Series lengths.'
+    )
+
+    args = parser.parse_args()
+
+    print('%10s  %10s  %10s  %12s  %10s' % (
+        'samples', 'build (s)', 'draw (s)', 'full draw (s)', 'vertices'))
+
+    for n in args.sizes:
+
+        x = np.arange(n, dtype = float)
+        y = np.cumsum(np.random.randn(n))
+
+        t0 = time.time()
+
+        plot, line = _decimated(x, y)
+
+        build = time.time() - t0
+
+        draw = _draw_time(plot.canvas().figure)
+
+        fig, ax = plt.subplots(figsize = (8, 4))
+        ax.plot(x, y)
+
+        full = _draw_time(fig)
+
+        plt.close('all')
+
+        print('%10d  %10.3f  %10.3f  %12.3f  %10d' % (
+            n, build, draw, full, len(line.get_xdata())))
+
+
+def _decimated(x, y):
+
+    plot = Plot(8, 4)
+
+    vbox = VBox()
+    vbox.append(plot)
+
+    Window(vbox, 'decimation benchmark')
+
+    return plot, plot.series(x, y)
+
+
+def _draw_time(fig):
+
+    fig.canvas.draw()
+
+    t0 = time.time()
+
+    fig.canvas.draw()
+
+    return time.time() - t0
+
+
+if __name__ == "__main__":
+    main()
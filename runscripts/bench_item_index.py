@@ -0,0 +1,84 @@
+"""
+Benchmarks the ComboBox type-ahead search against the number of items.
+
+Reports the time to build the ItemIndex and the worst time of a prefix and
+a substring search over a set of queries, compared with a linear scan.
+"""
+
+import argparse
+import random
+import time
+
+
+from mplapp.item_index import ItemIndex
+
+
+QUERIES = ['a', 'bo', 'xyz', 'mpl', 'q1', 'data_2']
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '-n',
+        '--sizes',
+        type = int,
+        nargs = '+',
+        default = [1000, 10000, 100000],
+        help = 'Number of items to index.'
+    )
+
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    print('%8s  %10s  %12s  %15s  %10s' % (
+        'items', 'build (ms)', 'prefix (ms)', 'substring (ms)', 'scan (ms)'))
+
+    for n in args.sizes:
+
+        items = [_random_item() for _ in range(n)]
+
+        t0 = time.time()
+
+        index = ItemIndex(items, substring = True)
+
+        t_build = time.time() - t0
+
+        t_prefix = max(_time(index.prefix, q) for q in QUERIES)
+        t_substring = max(_time(index.substring, q) for q in QUERIES)
+        t_scan = max(_time(_scan, items, q) for q in QUERIES)
+
+        print('%8d  %10.1f  %12.3f  %15.3f  %10.3f' % (
+            n,
+            1000.0 * t_build,
+            1000.0 * t_prefix,
+            1000.0 * t_substring,
+            1000.0 * t_scan,
+        ))
+
+
+def _random_item():
+
+    letters = 'abcdefghijklmnopqrstuvwxyz0123456789_'
+
+    return ''.join(
+        random.choice(letters) for _ in range(random.randint(3, 12)))
+
+
+def _scan(items, query):
+    return [i for i, item in enumerate(items) if query in item.lower()]
+
+
+def _time(func, *args):
+
+    t0 = time.time()
+
+    func(*args)
+
+    return time.time() - t0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Measures the latency of a two slider lookup against the cost of the
+function behind it.
+
+For each cost, a Gaussian that also sleeps that long per call is built
+into a LookupTable over (mu, sigma), then looked up at random slider
+positions, and compared with calling the function directly.
+"""
+
+import argparse
+import functools
+import time
+
+
+import numpy as np
+
+
+from mplapp.lookup_table import LookupTable
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--costs',
+        type = float,
+        nargs = '+',
+        default = [0.0, 0.001, 0.01],
+        help = 'Seconds per call of the function.'
+    )
+
+    parser.add_argument(
+        '--lookups',
+        type = int,
+        default = 200,
+        help = 'Random slider positions looked up.'
+    )
+
+    args = parser.parse_args()
+
+    t = np.linspace(-5, 5, 1000)
+
+    axes = [np.linspace(-5, 5, 41), np.linspace(0.2, 5, 25)]
+
+    rng = np.random.RandomState(0)
+
+    positions = np.column_stack([
+        rng.uniform(-5, 5, args.lookups),
+        rng.uniform(0.2, 5, args.lookups),
+    ])
+
+    print('%10s  %10s  %14s  %14s  %10s' % (
+        'cost (ms)', 'build (s)', 'lookup (ms)', 'direct (ms)', 'max error'))
+
+    for cost in args.costs:
+
+        func = functools.partial(slow_gaussian, t, cost)
+
+        t0 = time.time()
+
+        table = LookupTable(func, axes)
+        table.build()
+
+        build = time.time() - t0
+
+        t0 = time.time()
+        results = [table(*p) for p in positions]
+        lookup = (time.time() - t0) / len(positions)
+
+        t0 = time.time()
+        exact = [func(*p) for p in positions[:20]]
+        direct = (time.time() - t0) / 20
+
+        error = max(
+            np.abs(r - e).max() for r, e in zip(results[:20], exact))
+
+        print('%10.1f  %10.2f  %14.3f  %14.3f  %10.4f' % (
+            1000 * cost, build, 1000 * lookup, 1000 * direct, error))
+
+
+def slow_gaussian(t, cost, mu, sigma):
+
+    if cost:
+        time.sleep(cost)
+
+    return np.exp(-(t - mu) ** 2 / (2 * sigma ** 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Measures opening and panning a recording that is memory-mapped rather than
+loaded.
+
+Writes a random walk of float32 samples to a raw file, opens it twice, the
+first open builds the pyramid next to the file, then pans the view across
+it and back, and prints the time per envelope, the page cache statistics
+and the peak resident memory.
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+
+import numpy as np
+
+
+from mplapp.data_source import open_recording
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--samples',
+        type = int,
+        default = 2 ** 27,
+        help = 'Samples in the recording.'
+    )
+
+    parser.add_argument(
+        '--columns',
+        type = int,
+        default = 800,
+        help = 'Pixel columns of the view.'
+    )
+
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+
+    try:
+        path = os.path.join(tmp, 'recording.f32')
+
+        _write_recording(path, args.samples)
+
+        print('%.0f MB recording' % (os.path.getsize(path) / 2.0 ** 20))
+
+        t0 = time.time()
+        open_recording(path, persist = True)
+        print('first open (builds pyramid)  %8.3f s' % (time.time() - t0))
+
+        t0 = time.time()
+        source = open_recording(path, persist = True)
+        print('open                         %8.3f s' % (time.time() - t0))
+
+        pyramid = source.pyramid()
+
+        n = args.samples
+
+        # 20 steps of a tenth of the series forward, then back
+
+        span = n / 10.0
+
+        starts = list(np.linspace(0, n - span, 20))
+        starts += starts[::-1]
+
+        for name, views in [
+                ('full view', [(0, n)] * 4),
+                ('pan', [(x0, x0 + span) for x0 in starts]),
+            ]:
+
+            times = []
+
+            for x0, x1 in views:
+                t0 = time.time()
+                pyramid.envelope(x0, x1, args.columns)
+                times.append(time.time() - t0)
+
+            half = len(times) // 2
+
+            print('%-12s first half %8.2f ms   second half %8.2f ms' % (
+                name,
+                1000.0 * np.mean(times[:half]),
+                1000.0 * np.mean(times[half:]),
+            ))
+
+        print(source.cache_stats())
+
+        print('peak resident memory %.0f MB' % _max_rss_mb())
+
+    finally:
+        shutil.rmtree(tmp)
+
+
+def _write_recording(path, n, chunk = 2 ** 22):
+
+    level = 0.0
+
+    with open(path, 'wb') as fd:
+
+        for i in range(0, n, chunk):
+
+            y = level + np.cumsum(np.random.randn(min(chunk, n - i)))
+
+            level = y[-1]
+
+            y.astype(np.float32).tofile(fd)
+
+
+def _max_rss_mb():
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # bytes on macOS, kilobytes elsewhere
+
+    if os.uname()[0] == 'Darwin':
+        return rss / 2.0 ** 20
+
+    return rss / 2.0 ** 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmarks the LineEdit character position measurement against text length.
+
+Compares the cached glyph advance measurement with the reference per prefix
+measurement and reports the largest difference in pixels, on the sample text
+and on random strings rich in kerning pairs and overhanging glyphs.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+
+from mplapp.text_metrics import measure_per_prefix
+from mplapp.text_metrics import text_positions
+
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog, AVAVA To Ty 0123456789. '
+
+# pieces of the random strings
+
+KERNING = [
+    'AV', 'VA', 'WA', 'To', 'Ty', 'Yo', 'LT', 'fi', 'ff', 'fj', 'T.', 'y,',
+    'a', 'e', 'o', '.', ',', ' ', '  ',
+]
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '-n',
+        '--lengths',
+        type = int,
+        nargs = '+',
+        default = [10, 50, 100, 200, 400],
+        help = 'Text lengths to measure.'
+    )
+
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        type = int,
+        default = 3,
+        help = 'Number of repetitions, the best time is reported.'
+    )
+
+    parser.add_argument(
+        '--random',
+        type = int,
+        default = 20,
+        help = 'Number of random strings compared per length.'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type = int,
+        default = 0,
+        help = 'Seed of the random strings.'
+    )
+
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    fig = plt.figure(figsize = (6, 0.5))
+
+    ax = fig.add_axes([0, 0, 1, 1])
+
+    text = ax.text(0.02, 0.5, '', ha = 'left', va = 'center')
+
+    fig.canvas.draw()
+
+    print('%8s  %14s  %14s  %10s  %12s' % (
+        'length', 'per prefix (ms)', 'cached (ms)', 'max diff', 'random diff'))
+
+    for n in args.lengths:
+
+        s = (SAMPLE * (n // len(SAMPLE) + 1))[:n]
+
+        text.set_text(s)
+
+        t_prefix, expected = _best_of(args.repeat, measure_per_prefix, text)
+        t_cached, actual = _best_of(args.repeat, text_positions, text)
+
+        diff = _diff(expected, actual)
+
+        random_diff = 0.0
+
+        for _ in range(args.random):
+
+            text.set_text(_random_text(rng, n))
+
+            random_diff = max(
+                random_diff,
+                _diff(measure_per_prefix(text), text_positions(text)))
+
+        print('%8d  %14.2f  %14.2f  %10.3f  %12.3f' % (
+            n, 1000.0 * t_prefix, 1000.0 * t_cached, diff, random_diff))
+
+
+def _best_of(repeat, func, text):
+
+    best = None
+
+    for _ in range(repeat):
+
+        t0 = time.time()
+
+        result = func(text)
+
+        dt = time.time() - t0
+
+        if best is None or dt < best:
+            best = dt
+
+    return best, result
+
+
+def _diff(expected, actual):
+    return np.abs(np.array(expected) - np.array(actual)).max()
+
+
+def _random_text(rng, n):
+
+    s = ''
+
+    while len(s) < n:
+        s += rng.choice(KERNING)
+
+    return s[:n]
+
+
+if __name__ == "__main__":
+    main()
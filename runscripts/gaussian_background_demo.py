@@ -0,0 +1,198 @@
+"""
+The Gaussian demo with an artificially expensive compute step.
+
+The curve is computed by a BackgroundTask, so the sliders keep following the
+pointer while the work runs on a worker, stale slider values are dropped and
+only the latest one is computed.  Run with --foreground to compare with
+computing in the slider callback.
+"""
+
+import argparse
+import time
+
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+from mplapp.background import BackgroundTask
+from mplapp.background import process_pool
+from mplapp.window import Window
+from mplapp.horizontal_box import HorizontalBox as HBox
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.label import Label
+from mplapp.slider import Slider
+from mplapp.plot import Plot
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--delay',
+        type = float,
+        default = 0.25,
+        help = 'Seconds the compute step takes.'
+    )
+
+    parser.add_argument(
+        '--processes',
+        action = 'store_true',
+        help = 'Compute on a process pool instead of a thread pool.'
+    )
+
+    parser.add_argument(
+        '--foreground',
+        action = 'store_true',
+        help = 'Compute in the slider callback, blocking the GUI.'
+    )
+
+    args = parser.parse_args()
+
+    mu = 0.0
+    sigma = 1.0
+
+    mu0, mu1 = -5.0, 5.0
+    sigma0, sigma1 = 0.1, 5.0
+
+    plot = Plot(5, 4)
+
+    status = Label(5, 0.4, '', ha = 'left')
+
+    drawer = ExpensiveGaussian(plot, status, mu, sigma, args.delay)
+
+    if args.foreground:
+        update = drawer.update_now
+
+    else:
+
+        executor = process_pool() if args.processes else None
+
+        task = BackgroundTask(compute, drawer.done, plot, executor)
+
+        update = drawer.updater(task)
+
+    mu_slider = Slider(
+        5,
+        0.25,
+        notify = lambda v: update(mu = v),
+        vmin = mu0,
+        vmax = mu1,
+        vinit = mu,
+    )
+
+    sigma_slider = Slider(
+        5,
+        0.25,
+        notify = lambda v: update(sigma = v),
+        vmin = sigma0,
+        vmax = sigma1,
+        vinit = sigma,
+    )
+
+    col1 = VBox()
+    col1.append(
+        Label(1.0, 4, 'plot'),
+        Label(1.0, 0.25, '$\mu$'),
+        Label(1.0, 0.25, '$\sigma$'),
+        Label(1.0, 0.4, ''),
+    )
+
+    col2 = VBox()
+    col2.append(plot, mu_slider, sigma_slider, status)
+
+    hbox = HBox(va = 'top', padding = 0.05)
+    hbox.append(col1, col2)
+
+    window = Window(hbox, 'Gaussian Drawing, background compute')
+
+    ax = plot.axes()
+
+    x = drawer.time_axis()
+
+    ax.plot(x, compute(x, mu, sigma, 0.0)[1], 'b-')
+    ax.grid(True)
+    ax.set_xlim([mu0, mu1])
+    ax.set_ylim([-0.05, 1.05])
+
+    plt.show()
+
+
+def compute(x, mu, sigma, delay):
+    """
+    The expensive step, a top level function so a process pool can run it.
+    """
+
+    t0 = time.time()
+
+    time.sleep(delay)
+
+    y = np.exp(- ( (x - mu) ** 2 / (2 * sigma ** 2)))
+
+    return (mu, sigma, time.time() - t0), y
+
+
+class ExpensiveGaussian(object):
+
+    def __init__(self, plot_widget, status_label, mu, sigma, delay):
+
+        self._plot_widget = plot_widget
+        self._status = status_label
+
+        self._mu = mu
+        self._sigma = sigma
+        self._delay = delay
+
+        self._x = np.linspace(-5.0, 5.0, 1000)
+
+
+    def time_axis(self):
+        return self._x
+
+
+    def updater(self, task):
+        """
+        Returns a callback that submits the latest parameters to the task.
+        """
+
+        def update(mu = None, sigma = None):
+            self._set(mu, sigma)
+            task(self._x, self._mu, self._sigma, self._delay)
+
+        return update
+
+
+    def update_now(self, mu = None, sigma = None):
+        self._set(mu, sigma)
+        self.done(compute(self._x, self._mu, self._sigma, self._delay))
+
+
+    def done(self, result):
+        """
+        Called on the GUI thread with the computed curve.
+        """
+
+        (mu, sigma, dt), y = result
+
+        line = self._plot_widget.axes().get_lines()[0]
+
+        line.set_ydata(y)
+
+        self._status.text(
+            ' mu = %.2f, sigma = %.2f, computed in %.2f s' % (mu, sigma, dt))
+
+        self._plot_widget.canvas().draw_idle()
+
+
+    def _set(self, mu, sigma):
+
+        if mu is not None:
+            self._mu = mu
+
+        if sigma is not None:
+            self._sigma = sigma
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import argparse
+import functools
 
 
 import numpy as np
@@ -14,6 +15,11 @@ from mplapp.spacer import Spacer
 from mplapp.button import Button
 from mplapp.slider import Slider
 from mplapp.plot import Plot
+from mplapp.memo import Memo
+from mplapp import instrument
+from mplapp import trace
+from mplapp.binding import Value, Computed, bind_text, bind_line
+from mplapp.binding import stats as binding_stats
 
 
 def main():
@@ -27,11 +33,32 @@ def main():
         help = 'Show the bounding boxes around Spacers and Labels.'
     )
 
+    parser.add_argument(
+        '-p',
+        '--profile',
+        action = 'store_true',
+        help = 'Time the widgets and print a report and the cache and '
+               'binding statistics on exit.'
+    )
+
+    parser.add_argument(
+        '-t',
+        '--trace',
+        metavar = 'FILE',
+        help = 'Record the session into a Chrome trace-event JSON file.'
+    )
+
     args = parser.parse_args()
 
     if args.debug:
         Debug.value = True
 
+    if args.trace:
+        trace.start()
+
+    elif args.profile:
+        instrument.enable()
+
     #--------------------------------------------------------------------------
     # various sizes of widget element
 
@@ -69,12 +96,11 @@ def main():
     sigma_value_label = Label(0.50, plot_height, ' %.2f' % sigma, ha = 'left', ec = get_edgecolor())
     plot = Plot(plot_width, plot_height)
 
-    # objects that respond to the sliders and redraw the plot
+    # the values set by the sliders, bound to the labels and the plot once
+    # it's rendered
 
-    gaussian_drawer = DrawGaussian(plot, mu, sigma)
-
-    mu_updater = LabelUpdater('mu', mu_value_label, gaussian_drawer.redraw)
-    sigma_updater = LabelUpdater('sigma', sigma_value_label, gaussian_drawer.redraw)
+    mu_value = Value(mu)
+    sigma_value = Value(sigma)
 
     #--------------------------------------------------------------------------
     # column 1: spacer title, spacer plot left, spacer plot bottom, mu label
@@ -143,10 +169,11 @@ def main():
     slider = Slider(
         plot_width,
         slider_size,
-        notify = mu_updater.update,
+        notify = mu_value,
         vmin = mu0,
         vmax = mu1,
         vinit = mu,
+        resolution = 0.01,
     )
 
     col2.append(slider)
@@ -173,10 +200,11 @@ def main():
     slider = Slider(
         slider_size,
         plot_height,
-        notify = sigma_updater.update,
+        notify = sigma_value,
         vmin = sigma0,
         vmax = sigma1,
         vinit = sigma,
+        resolution = 0.01,
     )
 
     hbox = HBox()
@@ -216,19 +244,39 @@ def main():
 
     x = np.linspace(mu0, mu1, (mu1 - mu0) * samplerate)
 
-    y = gaussian_drawer.compute(x, mu, sigma)
+    # prefetching stays within the sliders, sigma away from 0
+
+    limits = [(mu0, mu1), (max(sigma0, 0.01), sigma1)]
+
+    gaussian_drawer = DrawGaussian(plot, x, limits)
+
+    curve = Computed(gaussian_drawer.curve, mu_value, sigma_value)
 
-    plt.plot(x, y, 'b-')
+    line, = plt.plot(x, curve.get(), 'b-')
     plt.grid(True)
     plt.xlabel('Time (s)')
     plt.ylabel('Amplitude')
     plt.xlim([mu0, mu1])
     plt.ylim([-0.05, 1.05])
 
+    bind_text(mu_value_label, mu_value, ' %.2f')
+    bind_text(sigma_value_label, sigma_value, ' %.2f')
+    bind_line(plot, line, curve)
+
     # enter matplotlib event loop
 
     plt.show()
 
+    if args.trace:
+        trace.stop().save_chrome(args.trace)
+
+    if args.profile:
+        print(instrument.report(window))
+
+    elif args.debug:
+        print(gaussian_drawer.stats())
+        print(binding_stats())
+
 
 #------------------------------------------------------------------------------
 # support utilities
@@ -272,32 +320,20 @@ def get_edgecolor():
         return 'none'
 
 
-class LabelUpdater(object):
-
-    def __init__(self, name, label, notify, fmt = ' %.2f'):
-
-        self._name = name
-        self._label = label
-        self._fmt = fmt
-        self._notify = notify
-
-
-    def update(self, new_value):
-        self._label.text(self._fmt % new_value)
-        self._notify(name = self._name, value = new_value)
-
-
 class DrawGaussian(object):
 
-    def __init__(self, plot_widget, mu, sigma):
+    def __init__(self, plot_widget, time_axis, limits):
 
-        self._plot_widget = plot_widget
+        # the curves for the slider positions, and the ones around the
+        # current position, within limits, while the sliders are idle
 
-        self._line = None
-        self._time_axis = None
-
-        self._mu = mu
-        self._sigma = sigma
+        self._memo = Memo(
+            functools.partial(self.compute, time_axis),
+            resolution = 0.01,
+            prefetch = 4,
+            limits = limits,
+            widget = plot_widget,
+        )
 
 
     def compute(self, taxis, mu, sigma):
@@ -307,26 +343,15 @@ class DrawGaussian(object):
         return np.exp(- ( (taxis - mu) ** 2 / (2 * sigma ** 2)))
 
 
-    def redraw(self, name = '', value = None):
-
-        if self._line is None:
-
-            self._line = self._plot_widget.axes().get_lines()[0]
-
-            self._time_axis = self._line.get_data()[0]
-
-        if name == 'mu':
-            self._mu = value
-
-        elif name == 'sigma':
-            self._sigma = value
-
-        x = self._time_axis
+    def curve(self, mu, sigma):
+        """
+        Returns the y data for the slider positions, memoized.
+        """
+        return self._memo(mu, sigma)
 
-        y = self.compute(x, self._mu, self._sigma)
 
-        self._line.set_data(x, y)
-        self._line.axes.figure.canvas.draw_idle()
+    def stats(self):
+        return self._memo.stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""
+Drags a slider driving an expensive model with progressive rendering.
+
+The model, a square wave summed from its harmonics, is evaluated on a
+tenth of the time axis while the slider is dragged, and on all of it once
+the slider is released.  The render counts are printed when the window is
+closed.
+"""
+
+import argparse
+
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+from mplapp.window import Window
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.slider import Slider
+from mplapp.plot import Plot
+from mplapp.progressive import Progressive
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--samples',
+        type = int,
+        default = 20000,
+        help = 'Samples of the full resolution curve.'
+    )
+
+    parser.add_argument(
+        '--harmonics',
+        type = int,
+        default = 200,
+        help = 'Harmonics summed by the model, its cost.'
+    )
+
+    parser.add_argument(
+        '--coarse',
+        type = float,
+        default = 0.1,
+        help = 'Fraction of the samples evaluated while dragging.'
+    )
+
+    args = parser.parse_args()
+
+    plot = Plot(8, 4)
+
+    def draw(budget, freq):
+
+        t = np.linspace(0, 1, max(int(budget * args.samples), 2))
+
+        line.set_data(t, square_wave(t, freq, args.harmonics))
+        line.set_color('r' if budget < 1.0 else 'b')
+
+        plot.canvas().draw_idle()
+
+    progressive = Progressive(draw, plot, coarse = args.coarse)
+
+    slider = Slider(
+        8,
+        0.3,
+        notify = progressive,
+        vmin = 0.5,
+        vmax = 5.0,
+        vinit = 1.0,
+    )
+
+    vbox = VBox()
+    vbox.append(plot, slider)
+
+    window = Window(vbox, 'Progressive rendering')
+
+    ax = plot.axes()
+    ax.set_xlim(0, 1)
+    ax.set_ylim(-1.5, 1.5)
+    ax.grid(True)
+
+    line, = ax.plot([], [], 'b-')
+
+    progressive(1.0)
+
+    plt.show()
+
+    print(progressive.stats())
+
+
+def square_wave(t, freq, harmonics):
+
+    k = np.arange(1, 2 * harmonics, 2)[:, None]
+
+    return 4 / np.pi * (np.sin(2 * np.pi * k * freq * t) / k).sum(axis = 0)
+
+
+if __name__ == "__main__":
+    main()
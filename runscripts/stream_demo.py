@@ -0,0 +1,110 @@
+"""
+Streams a 1 kHz signal into a Plot.
+
+A canvas timer generates the samples that arrived since its last tick and
+appends them as arrays, the Plot blits the line and pages the x-limits
+forward.  The redraw statistics are printed when the window is closed.
+"""
+
+import argparse
+import time
+
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+from mplapp.window import Window
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.label import Label
+from mplapp.plot import Plot
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        '--rate',
+        type = float,
+        default = 1000.0,
+        help = 'Samples per second.'
+    )
+
+    parser.add_argument(
+        '--span',
+        type = float,
+        default = 5.0,
+        help = 'Seconds of signal shown.'
+    )
+
+    args = parser.parse_args()
+
+    capacity = int(args.rate * args.span)
+
+    plot = Plot(
+        8,
+        4,
+        capacity = capacity,
+        autoscroll = True,
+        xspan = args.span,
+        line_kw = dict(color = 'b', lw = 1.0),
+    )
+
+    status = Label(8, 0.4, '', ha = 'left')
+
+    vbox = VBox()
+    vbox.append(plot, status)
+
+    window = Window(vbox, 'Streaming plot')
+
+    ax = plot.axes()
+    ax.set_ylim([-1.5, 1.5])
+    ax.grid(True)
+
+    source = SignalSource(args.rate)
+
+    def on_tick():
+        x, y = source.read()
+        plot.append(x, y)
+        status.text(' %d samples' % source.count())
+
+    timer = window.canvas().new_timer(interval = 16)
+    timer.add_callback(on_tick)
+    timer.start()
+
+    plt.show()
+
+    print(window.redraw_stats())
+
+
+class SignalSource(object):
+    """
+    Simulates an acquisition device, returns the samples since the last read.
+    """
+
+    def __init__(self, rate):
+        self._rate = rate
+        self._t0 = time.time()
+        self._n = 0
+
+
+    def count(self):
+        return self._n
+
+
+    def read(self):
+
+        n = int((time.time() - self._t0) * self._rate)
+
+        t = np.arange(self._n, n) / self._rate
+
+        self._n = n
+
+        y = np.sin(2 * np.pi * 0.5 * t) + 0.1 * np.random.randn(len(t))
+
+        return t, y
+
+
+if __name__ == "__main__":
+    main()
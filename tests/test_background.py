@@ -0,0 +1,80 @@
+import threading
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+
+from mplapp.window import Window
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.label import Label
+from mplapp.background import BackgroundTask
+
+
+def test_cancel_running_job():
+
+    label = Label(1.5, 0.3, 'result')
+
+    vbox = VBox()
+    vbox.append(label)
+
+    w = Window(vbox, 'background')
+
+    lock = threading.Lock()
+    started = threading.Event()
+    release = threading.Event()
+
+    running = [0]
+    overlaps = []
+    results = []
+
+    def compute(x):
+
+        with lock:
+            running[0] += 1
+            overlaps.append(running[0])
+
+        started.set()
+        release.wait(5.0)
+
+        with lock:
+            running[0] -= 1
+
+        return x
+
+    task = BackgroundTask(compute, results.append, label)
+
+    try:
+
+        task(1)
+
+        started.wait(5.0)
+
+        # the job is running, it can't be cancelled, the next input waits
+        # for it
+
+        task.cancel()
+
+        task(2)
+
+        time.sleep(0.05)
+
+        assert max(overlaps) == 1
+        assert task.busy()
+
+        release.set()
+
+        t0 = time.time()
+
+        while task.busy() and time.time() - t0 < 5.0:
+            w._calls.drain()
+            time.sleep(0.01)
+
+        assert max(overlaps) == 1
+        assert results == [2]
+        assert task.stats() == dict(submitted = 2, dropped = 1, delivered = 1)
+
+    finally:
+        release.set()
+        plt.close(w.figure())
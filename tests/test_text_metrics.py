@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+
+from mplapp.text_metrics import CaretTable
+from mplapp.text_metrics import measure_per_prefix
+from mplapp.text_metrics import text_positions
+
+
+# kerning pairs and overhanging glyphs
+
+PIECES = [
+    'AV', 'VA', 'WA', 'To', 'Ty', 'Yo', 'LT', 'fi', 'ff', 'fj', 'T.', 'y,',
+    'a', 'e', 'o', '.', ',', ' ', '  ',
+]
+
+
+def _random_text(rng, n):
+
+    s = ''
+
+    while len(s) < n:
+        s += rng.choice(PIECES)
+
+    return s[:n]
+
+
+def _text():
+
+    fig = plt.figure(figsize = (6, 0.5))
+
+    ax = fig.add_axes([0, 0, 1, 1])
+
+    text = ax.text(0.02, 0.5, '', ha = 'left', va = 'center')
+
+    fig.canvas.draw()
+
+    return text
+
+
+def test_text_positions_random():
+
+    rng = random.Random(0)
+
+    text = _text()
+
+    try:
+
+        for _ in range(10):
+
+            text.set_text(_random_text(rng, 200))
+
+            expected = np.array(measure_per_prefix(text))
+            actual = np.array(text_positions(text))
+
+            assert np.abs(expected - actual).max() <= 1.0
+
+    finally:
+        plt.close(text.figure)
+
+
+def test_caret_table_edit_random():
+
+    rng = random.Random(1)
+
+    text = _text()
+
+    try:
+
+        # single glyphs, so edits land between overhanging ones
+
+        glyphs = 'ffo.T,i '
+
+        s = 'x' + ''.join(rng.choice(glyphs) for _ in range(60))
+
+        text.set_text(s)
+
+        table = CaretTable(text)
+        table.rebuild(0)
+
+        for version in range(1, 200):
+
+            i0 = rng.randrange(1, len(s) + 1)
+            i1 = min(len(s), i0 + rng.randrange(3))
+
+            new = ''.join(rng.choice(glyphs) for _ in range(rng.randrange(3)))
+
+            s = s[:i0] + new + s[i1:]
+
+            text.set_text(s)
+
+            table.edit(i0, i1, len(new), version)
+
+            rebuilt = CaretTable(text)
+            rebuilt.rebuild(version)
+
+            assert np.allclose(table.positions(), rebuilt.positions())
+
+    finally:
+        plt.close(text.figure)
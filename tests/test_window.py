@@ -0,0 +1,148 @@
+import gc
+import weakref
+
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import MouseEvent
+
+
+from mplapp.window import Window
+from mplapp.vertical_box import VerticalBox as VBox
+from mplapp.button import Button
+from mplapp.combo_box import ComboBox
+from mplapp.combo_box import ComboState
+from mplapp.label import Label
+
+
+def test_button_draw():
+
+    button = Button(1.5, 1.5, 'ClickMe')
+
+    vbox = VBox()
+    vbox.append(button)
+
+    w = Window(vbox, 'button')
+
+    try:
+
+        w.canvas().draw()
+
+        ax = button.axes()
+
+        assert ax.patch in w._animated[ax]
+        assert ax in w._backgrounds
+
+        w.request_redraw(button)
+        w.flush_redraws()
+
+        assert w.redraw_stats()['blits'] == 1
+
+    finally:
+        plt.close(w.figure())
+
+
+def test_closed_windows_are_freed():
+
+    refs = []
+
+    for _ in range(5):
+
+        vbox = VBox()
+        vbox.append(Button(1.5, 1.5, 'ClickMe'))
+
+        w = Window(vbox, 'button')
+
+        w.canvas().draw()
+
+        assert Window.find(w.figure()) is w
+
+        refs.append(weakref.ref(w))
+
+        plt.close(w.figure())
+
+    del w, vbox
+
+    gc.collect()
+
+    assert [r() for r in refs] == [None] * 5
+
+
+def test_repaint_under_dropdown():
+
+    combo = ComboBox(3.0, 0.3, ['item %d' % i for i in range(10)])
+    label = Label(3.0, 0.3, 'hello')
+
+    vbox = VBox()
+    vbox.append(combo, label)
+
+    w = Window(vbox, 'dropdown')
+
+    try:
+
+        canvas = w.canvas()
+
+        canvas.draw()
+
+        combo._cb_change_state(ComboState.DROP_SELECT)
+        w.flush_redraws()
+
+        # the label is under the open dropdown, blitting it must not paint
+        # over the dropdown
+
+        label.text('WWWWWWWWWWWWWWWWWWWW')
+        w.flush_redraws()
+
+        blitted = np.array(canvas.buffer_rgba())
+
+        canvas.draw()
+
+        assert (blitted == np.array(canvas.buffer_rgba())).all()
+
+    finally:
+        plt.close(w.figure())
+
+
+def test_button_pressed_before_callback():
+
+    seen = []
+
+    def on_click(event):
+
+        # what the canvas shows while the callback runs
+
+        x, y = [int(v) for v in button.axes().bbox.bounds[:2]]
+
+        h = canvas.get_width_height()[1]
+
+        rgba = np.array(canvas.buffer_rgba())[h - y - 3, x + 3]
+
+        seen.append(tuple(rgba[:3] / 255.0))
+
+    button = Button(1.5, 1.5, 'ClickMe', on_click)
+
+    vbox = VBox()
+    vbox.append(button)
+
+    w = Window(vbox, 'button')
+
+    try:
+
+        canvas = w.canvas()
+
+        canvas.draw()
+
+        x, y = button.axes().bbox.get_points().mean(0)
+
+        event = MouseEvent('button_press_event', canvas, x, y, button = 1)
+
+        canvas.callbacks.process(event.name, event)
+
+        pressed = np.array(button._pressed_color)
+
+        assert np.abs(np.array(seen[0]) - pressed).max() < 0.01
+
+    finally:
+        plt.close(w.figure())